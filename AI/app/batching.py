@@ -0,0 +1,96 @@
+import asyncio
+import inspect
+import time
+
+
+class MicroBatcher:
+    """
+    Collects concurrent classify calls for up to `max_wait_ms` or `max_batch_size`
+    items, runs one batched `predict` over them and hands each caller its own result.
+    `predict` may be sync (run in a worker thread) or async. `on_batch`, if
+    given, is called with each batch's size and how long its items queued.
+    """
+
+    def __init__(self, predict, max_batch_size=32, max_wait_ms=5, max_concurrency=1, on_batch=None):
+        self.predict = predict
+        self.on_batch = on_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # How many batches may be in flight at once. 1 suits a CPU model that
+        # already uses every core; an upstream API can take more.
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.queue = None
+        self._runner = None
+        self._inflight = set()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._runner:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+        # Nobody is left to serve what is still queued.
+        while self.queue and not self.queue.empty():
+            _, future, _ = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def submit_many(self, items):
+        return await asyncio.gather(*(self.submit(item) for item in items))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Drain whatever is already waiting before sleeping on the clock.
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up (client disconnect) are not worth computing for.
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                continue
+
+            await self.slots.acquire()
+            if self.on_batch:
+                now = time.perf_counter()
+                self.on_batch(len(batch), [now - enqueued for _, _, enqueued in batch])
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch):
+        items = [item for item, _, _ in batch]
+        try:
+            if inspect.iscoroutinefunction(self.predict):
+                results = await self.predict(items)
+            else:
+                results = await asyncio.to_thread(self.predict, items)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.slots.release()
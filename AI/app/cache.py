@@ -0,0 +1,152 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.metrics import CACHE_LOOKUPS
+from app.utils import clean_text
+
+
+class ResultCache:
+    """
+    Two-tier severity cache: an in-memory LRU with TTL in front of a SQLite file
+    that survives restarts.
+
+    Keys hash the cleaned title + description together with the engine version,
+    so retraining or switching engines starts from a cold cache on its own.
+    Memory evicts least-recently-used past `max_entries`; disk drops rows older
+    than `disk_ttl` and trims the oldest past `disk_max_entries`.
+    """
+
+    def __init__(self, version, max_entries=10000, ttl=3600, db_path=None,
+                 disk_ttl=30 * 24 * 3600, disk_max_entries=1000000):
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_ttl = disk_ttl
+        self.disk_max_entries = disk_max_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        self.db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            # Shared by worker threads; every use goes through self.lock.
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, severity TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+            self.db.commit()
+
+    def key(self, title, description):
+        raw = f"{self.version}\x00{clean_text(title)}\x00{clean_text(description)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Severities for `keys`, None where neither tier has one. Blocks on SQLite
+        and on writers holding the lock, so call it off the event loop.
+        """
+        now = time.time()
+        with self.lock:
+            results = [None] * len(keys)
+            missing = {}
+            for i, key in enumerate(keys):
+                entry = self.memory.get(key)
+                if entry is not None:
+                    severity, expires = entry
+                    if expires > now:
+                        self.memory.move_to_end(key)
+                        self.counts["memory_hits"] += 1
+                        CACHE_LOOKUPS.labels("memory").inc()
+                        results[i] = severity
+                        continue
+                    del self.memory[key]
+                    self.counts["expired"] += 1
+                missing.setdefault(key, []).append(i)
+
+            if missing and self.db is not None:
+                # One query per request, not per bug.
+                rows = self.db.execute(
+                    f"SELECT key, severity FROM results WHERE created > ? "
+                    f"AND key IN ({','.join('?' * len(missing))})",
+                    (now - self.disk_ttl, *missing),
+                ).fetchall()
+                for key, severity in rows:
+                    self._remember(key, severity, now)
+                    for i in missing.pop(key):
+                        self.counts["disk_hits"] += 1
+                        CACHE_LOOKUPS.labels("disk").inc()
+                        results[i] = severity
+
+            for positions in missing.values():
+                self.counts["misses"] += len(positions)
+                CACHE_LOOKUPS.labels("miss").inc(len(positions))
+            return results
+
+    def put_many(self, items):
+        now = time.time()
+        with self.lock:
+            for key, severity in items:
+                self._remember(key, severity, now)
+            if self.db is not None:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO results (key, severity, created) VALUES (?, ?, ?)",
+                    [(key, severity, now) for key, severity in items],
+                )
+                self.db.commit()
+
+    def prune(self):
+        """Applies the disk eviction policy; main.py runs it every few minutes."""
+        if self.db is None:
+            return 0
+        with self.lock:
+            removed = self.db.execute(
+                "DELETE FROM results WHERE created <= ?", (time.time() - self.disk_ttl,)
+            ).rowcount
+            removed += self.db.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            ).rowcount
+            self.db.commit()
+            return removed
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counts["memory_hits"] + self.counts["disk_hits"] + self.counts["misses"]
+            hits = lookups - self.counts["misses"]
+            disk_size = None
+            if self.db is not None:
+                disk_size = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                **self.counts,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "memory_size": len(self.memory),
+                "memory_max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "disk_size": disk_size,
+                "disk_max_entries": self.disk_max_entries if self.db is not None else None,
+                "disk_ttl_s": self.disk_ttl if self.db is not None else None,
+                "version": self.version,
+            }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+
+    def _remember(self, key, severity, now):
+        if self.max_entries <= 0:
+            return
+        self.memory[key] = (severity, now + self.ttl)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.counts["evictions"] += 1
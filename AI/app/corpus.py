@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+# Bugzilla exports (Mozilla, Netbeans, Openoffice): ';'-delimited, ~15 columns,
+# of which training only needs the summary, details and reported severity.
+SOURCES = ["RawData/Mozilla.csv", "RawData/Netbeans.csv", "RawData/Openoffice.csv"]
+COLUMNS = ["sd", "dt", "bsr"]
+
+SEVERITY_MAP = {
+    'blocker': 'High', 'critical': 'High', 's1': 'High', 'major': 'High', 's2': 'High',
+    'normal': 'Normal', 's3': 'Normal',
+    'minor': 'Low', 's4': 'Low', 'trivial': 'Low', 'enhancement': 'Low'
+}
+SEVERITY_DTYPE = pd.CategoricalDtype(["High", "Normal", "Low"])
+
+SNAPSHOT_DIR = "cache/corpus"
+# Bump when the chunk transform below changes, so old snapshots are not reused.
+SNAPSHOT_FORMAT = 1
+
+
+def check_severity_map(severity_map):
+    # astype(SEVERITY_DTYPE) would quietly turn any other label into NaN and
+    # the rows carrying it would be dropped as unmapped.
+    unknown = set(severity_map.values()) - set(SEVERITY_DTYPE.categories)
+    if unknown:
+        raise ValueError(f"severity_map targets must be High/Normal/Low, got {sorted(unknown)}")
+
+
+def iter_bug_reports(paths=SOURCES, severity_map=SEVERITY_MAP, chunksize=100000):
+    """
+    Yields labelled `sd`/`dt`/`bsr` frames of at most `chunksize` rows, so peak
+    memory depends on the chunk size rather than the size of the exports.
+    Rows whose severity is not in `severity_map` are dropped.
+    """
+    check_severity_map(severity_map)
+    dtypes = {"sd": "string", "dt": "string", "bsr": "category"}
+    for path in paths:
+        reader = pd.read_csv(path, delimiter=';', usecols=COLUMNS, dtype=dtypes, chunksize=chunksize)
+        for chunk in reader:
+            # Map the handful of distinct raw severities, not every row.
+            raw = chunk['bsr'].cat.categories
+            labels = dict(zip(raw, raw.str.lower().map(severity_map)))
+            chunk['bsr'] = chunk['bsr'].map(labels).astype(SEVERITY_DTYPE)
+            chunk = chunk.dropna(subset=['bsr'])
+            if len(chunk):
+                yield chunk.reset_index(drop=True)
+
+
+def snapshot_path(paths, severity_map, snapshot_dir=SNAPSHOT_DIR):
+    # Size + mtime of every source stand in for its contents: any re-export
+    # changes at least one of them and lands on a new snapshot name.
+    fingerprint = {
+        "format": SNAPSHOT_FORMAT,
+        "severity_map": severity_map,
+        "sources": [[os.path.abspath(p), os.stat(p).st_size, os.stat(p).st_mtime_ns] for p in paths],
+    }
+    digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(snapshot_dir, f"bugs-{digest}.parquet")
+
+
+def load_bug_reports(paths=SOURCES, severity_map=SEVERITY_MAP, chunksize=100000, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Labelled bug reports from `paths`, served from a Parquet snapshot when the
+    sources have not changed since it was written. A cold load streams the
+    CSVs chunk by chunk into the snapshot and then reads it back.
+    Without pyarrow it falls back to concatenating the chunks directly.
+    """
+    check_severity_map(severity_map)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow not installed; loading CSVs without a snapshot.")
+        return pd.concat(iter_bug_reports(paths, severity_map, chunksize), ignore_index=True)
+
+    path = snapshot_path(paths, severity_map, snapshot_dir)
+    if not os.path.exists(path):
+        print(f"Building corpus snapshot {path}...")
+        os.makedirs(snapshot_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        writer = None
+        try:
+            for chunk in iter_bug_reports(paths, severity_map, chunksize):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            return pd.DataFrame({c: pd.Series(dtype="string") for c in COLUMNS}).astype({"bsr": SEVERITY_DTYPE})
+        os.replace(tmp, path)
+
+    df = pd.read_parquet(path)
+    df['bsr'] = df['bsr'].astype(SEVERITY_DTYPE)
+    return df
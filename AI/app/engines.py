@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import inspect
+import os
+import joblib
+import numpy as np
+
+from app.metrics import stage_timer
+from app.policy import ThresholdPolicy
+
+# Severity labels shared by every engine, in the order the API reports them.
+LABELS = ["High", "Normal", "Low"]
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.getenv("TRIAGE_MODEL_PATH", os.path.join(APP_DIR, "model_v2.joblib"))
+EMBEDDER_NAME = os.getenv("TRIAGE_EMBEDDER", "all-MiniLM-L6-v2")
+ONNX_PATH = os.getenv("TRIAGE_ONNX_PATH", os.path.join(APP_DIR, "triage_v2.onnx"))
+ONNX_THREADS = int(os.getenv("TRIAGE_ONNX_THREADS", "0"))
+# Unset: plain argmax, as trainmodel_new.py evaluates model_v2. Set it to serve
+# "High if P(High) > threshold" instead; tune it for the model being served,
+# since 0.3 was picked for trainmodel_f.py's TF-IDF head, not this one.
+HIGH_THRESHOLD = float(os.environ["TRIAGE_HIGH_THRESHOLD"]) if os.getenv("TRIAGE_HIGH_THRESHOLD") else None
+
+HF_TOKEN = os.getenv("HF_TOKEN")
+API_URL = os.getenv("HF_API_URL", "https://router.huggingface.co/hf-inference/models/facebook/bart-large-mnli")
+
+
+class EngineError(Exception):
+    """An engine failure carrying the HTTP status the API should answer with."""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def policy_tag(threshold):
+    return "argmax" if threshold is None else f"t{threshold}"
+
+
+class LocalEngine:
+    """MiniLM embeddings + the logistic-regression head from trainmodel_new.py, in-process."""
+
+    name = "local"
+    # One batch at a time: encode already spreads across every core.
+    max_concurrency = 1
+
+    def __init__(self, model_path=MODEL_PATH, embedder_name=EMBEDDER_NAME, threshold=HIGH_THRESHOLD):
+        # Imported here so a remote-only deployment never pays for torch.
+        from sentence_transformers import SentenceTransformer
+
+        self.embedder = SentenceTransformer(embedder_name, device="cpu")
+        self.model = joblib.load(model_path)
+        self.policy = ThresholdPolicy(self.model.classes_, threshold) if threshold is not None else None
+        # Content hash, not file name: a retrained head must not reuse old cache entries.
+        self.version = f"{embedder_name}/{file_digest(model_path)}/{policy_tag(threshold)}"
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def predict(self, bugs):
+        # Same "summary + details" shape the head was trained on.
+        texts = [f"{title} {description}" for title, description in bugs]
+        with stage_timer(self.name, "embed"):
+            X = self.embedder.encode(texts, batch_size=32, show_progress_bar=False)
+        with stage_timer(self.name, "predict"):
+            if self.policy is None:
+                return [str(label) for label in self.model.predict(X)]
+            return [str(label) for label in self.policy.predict(self.model.predict_proba(X))]
+
+
+class OnnxEngine:
+    """
+    The LocalEngine pipeline exported by export_onnx.py as one int8 graph:
+    tokenizer + onnxruntime only, no torch in the serving process.
+    """
+
+    name = "onnx"
+    max_concurrency = 1
+
+    def __init__(self, onnx_path=ONNX_PATH, threshold=HIGH_THRESHOLD, threads=ONNX_THREADS):
+        import json
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        stem = onnx_path[:-len(".onnx")]
+        with open(f"{stem}.json") as f:
+            meta = json.load(f)
+        self.tokenizer = Tokenizer.from_file(f"{stem}.tokenizer.json")
+        self.tokenizer.enable_truncation(max_length=meta["max_length"])
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id("[PAD]"), pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        # 0 = one thread per core; lower it when running several workers per host.
+        options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.classes = np.asarray(meta["classes"])
+        self.policy = ThresholdPolicy(self.classes, threshold) if threshold is not None else None
+        self.version = f"onnx/{file_digest(onnx_path)}/{policy_tag(threshold)}"
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def predict(self, bugs):
+        with stage_timer(self.name, "tokenize"):
+            encodings = self.tokenizer.encode_batch([f"{title} {description}" for title, description in bugs])
+            inputs = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+        # One graph: embedding and the classifier head are not separable here.
+        with stage_timer(self.name, "predict"):
+            probs = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+            labels = self.classes[probs.argmax(axis=1)] if self.policy is None else self.policy.predict(probs)
+            return [str(label) for label in labels]
+
+
+class RemoteEngine:
+    """Zero-shot classification on the Hugging Face inference router."""
+
+    name = "remote"
+    # Batches are I/O-bound here, so many may wait on the router at once.
+    max_concurrency = int(os.getenv("TRIAGE_REMOTE_CONCURRENCY", "64"))
+
+    def __init__(self, api_url=API_URL, token=HF_TOKEN):
+        # Imported here so a local-only deployment never needs httpx.
+        from app.upstream import UpstreamClient
+
+        self.client = UpstreamClient(
+            api_url,
+            token,
+            max_concurrency=self.max_concurrency,
+            attempt_timeout=float(os.getenv("TRIAGE_REMOTE_TIMEOUT_S", "20")),
+            attempts=int(os.getenv("TRIAGE_REMOTE_ATTEMPTS", "2")),
+            # Under the backend's 45s axios timeout, so it never retries a call still running here.
+            deadline=float(os.getenv("TRIAGE_REMOTE_DEADLINE_S", "40")),
+        )
+        self.version = api_url
+
+    async def start(self):
+        await self.client.start()
+
+    async def close(self):
+        await self.client.close()
+
+    async def predict(self, bugs):
+        texts = [f"Title: {title}. Description: {description}" for title, description in bugs]
+        return await self.client.classify_many(texts)
+
+
+class FallbackEngine:
+    """Answers from `primary`, dropping to `fallback` only when the primary fails."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = primary.name
+        self.version = primary.version
+        self.max_concurrency = primary.max_concurrency
+
+    async def start(self):
+        await self.primary.start()
+        await self.fallback.start()
+
+    async def close(self):
+        await self.primary.close()
+        await self.fallback.close()
+
+    async def predict(self, bugs):
+        labels, _ = await self.answer(bugs)
+        return labels
+
+    async def answer(self, bugs):
+        try:
+            return await run_predict(self.primary, bugs), self.primary
+        except Exception as e:
+            print(f"[ENGINE FALLBACK] {self.primary.name} -> {self.fallback.name}: {e}")
+            return await run_predict(self.fallback, bugs), self.fallback
+
+
+async def run_predict(engine, bugs):
+    """Awaits async engines; runs sync (CPU-bound) ones off the event loop."""
+    if inspect.iscoroutinefunction(engine.predict):
+        return await engine.predict(bugs)
+    return await asyncio.to_thread(engine.predict, bugs)
+
+
+async def run_answer(engine, bugs):
+    """run_predict, plus the engine that actually answered."""
+    if isinstance(engine, FallbackEngine):
+        return await engine.answer(bugs)
+    return await run_predict(engine, bugs), engine
+
+
+def load_engine():
+    """
+    Builds the engine selected by TRIAGE_ENGINE: "onnx", "local" or "remote".
+    The default, "auto", serves the exported ONNX graph when it exists and the
+    PyTorch pipeline otherwise. TRIAGE_FALLBACK=remote keeps the Hugging Face
+    path behind the in-process engine, including when it cannot be loaded at all.
+    """
+    choice = os.getenv("TRIAGE_ENGINE", "auto").lower()
+    fallback = os.getenv("TRIAGE_FALLBACK", "").lower()
+
+    if choice == "auto":
+        choice = "onnx" if os.path.exists(ONNX_PATH) else "local"
+    if choice == "remote":
+        return RemoteEngine()
+    if choice not in ("local", "onnx"):
+        raise ValueError(f"Unknown TRIAGE_ENGINE: {choice}")
+
+    try:
+        engine = OnnxEngine() if choice == "onnx" else LocalEngine()
+    except Exception as e:
+        if fallback != "remote":
+            raise
+        print(f"[ENGINE LOAD FAILED] {choice}: {e}. Serving from remote only.")
+        return RemoteEngine()
+
+    if fallback == "remote":
+        return FallbackEngine(engine, RemoteEngine())
+    return engine
@@ -0,0 +1,130 @@
+import glob
+import hashlib
+import os
+import re
+import time
+import numpy as np
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).digest()[:16]
+
+
+class EmbeddingStore:
+    """
+    Content-addressed embedding cache for training runs.
+
+    Vectors live in `.npy` shards under `<root>/<embedder name>/`, each next to
+    a `.keys.npy` of 16-byte text hashes. Shards are opened with
+    `mmap_mode="r"`, so already-encoded rows are read straight from the page
+    cache (shared by every process using the same store) and only texts never
+    seen before are sent to the embedder. Each run that encodes new texts adds
+    a shard; past `max_shards` they are merged back into one.
+    """
+
+    def __init__(self, root, embedder_name, max_shards=8):
+        self.embedder_name = embedder_name
+        self.max_shards = max_shards
+        self.path = os.path.join(root, re.sub(r'[^A-Za-z0-9._-]+', '_', embedder_name))
+        os.makedirs(self.path, exist_ok=True)
+        self.stems = []
+        self.shards = []
+        self.index = {}
+        self.embedder = None
+        for keys_path in sorted(glob.glob(os.path.join(self.path, "*.keys.npy"))):
+            self._open_shard(keys_path[:-len(".keys.npy")])
+
+    def __len__(self):
+        return len(self.index)
+
+    def encode(self, texts, load_embedder, batch_size=64):
+        """
+        Returns a float32 matrix with one row per text. `load_embedder` is only
+        called (once) when some texts are missing, so a warm run never loads the model.
+
+        When the rows are one contiguous run of a single shard (e.g. the same
+        texts, in the same order, as the run that encoded them) the result is a
+        read-only view of the memory map rather than a copy, so processes
+        sharing the store share those pages too. Otherwise rows are gathered
+        into a new array.
+        """
+        texts = list(texts)
+        keys = [text_key(text) for text in texts]
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.index and key not in missing:
+                missing[key] = text
+        if missing:
+            print(f"Encoding {len(missing)} new texts of {len(texts)}...")
+            if self.embedder is None:
+                self.embedder = load_embedder()
+            vectors = self.embedder.encode(list(missing.values()), batch_size=batch_size, show_progress_bar=True)
+            self._write_shard(list(missing.keys()), np.asarray(vectors, dtype=np.float32))
+
+        locations = np.array([self.index[key] for key in keys], dtype=np.int64).reshape(-1, 2)
+        if not len(locations):
+            return np.empty((0, 0), dtype=np.float32)
+        shard_ids, shard_rows = locations[:, 0], locations[:, 1]
+        if (shard_ids == shard_ids[0]).all() and (np.diff(shard_rows) == 1).all():
+            return self.shards[shard_ids[0]][shard_rows[0]:shard_rows[-1] + 1]
+
+        dim = self.shards[0].shape[1]
+        out = np.empty((len(keys), dim), dtype=np.float32)
+        # One fancy-index gather per shard instead of a Python loop over rows.
+        for shard_id in np.unique(locations[:, 0]):
+            rows = locations[:, 0] == shard_id
+            out[rows] = self.shards[shard_id][locations[rows, 1]]
+        return out
+
+    def compact(self):
+        """
+        Merges every shard this store has open into one, keeping each key once.
+        Other processes that still map the old files keep reading them until
+        they reopen the store.
+        """
+        if len(self.shards) < 2:
+            return
+        keys = list(self.index)
+        locations = np.array([self.index[key] for key in keys], dtype=np.int64)
+        vectors = np.empty((len(keys), self.shards[0].shape[1]), dtype=np.float32)
+        for shard_id in np.unique(locations[:, 0]):
+            rows = locations[:, 0] == shard_id
+            vectors[rows] = self.shards[shard_id][locations[rows, 1]]
+        merged = self._save_shard(keys, vectors)
+
+        old, self.stems, self.shards, self.index = self.stems, [], [], {}
+        # Unmapped before removal: Windows cannot delete a mapped file.
+        for stem in old:
+            # Keys first, as in _save_shard: without them the shard no longer counts.
+            for suffix in (".keys.npy", ".npy"):
+                try:
+                    os.remove(stem + suffix)
+                except FileNotFoundError:
+                    # Another process compacted the same shards first.
+                    pass
+        self._open_shard(merged)
+
+    def _open_shard(self, stem):
+        keys = np.load(stem + ".keys.npy")
+        vectors = np.load(stem + ".npy", mmap_mode="r")
+        shard_id = len(self.shards)
+        self.stems.append(stem)
+        self.shards.append(vectors)
+        for row, key in enumerate(keys):
+            self.index.setdefault(key.tobytes(), (shard_id, row))
+
+    def _write_shard(self, keys, vectors):
+        self._open_shard(self._save_shard(keys, vectors))
+        if len(self.shards) > self.max_shards:
+            self.compact()
+
+    def _save_shard(self, keys, vectors):
+        stem = os.path.join(self.path, f"{time.time_ns()}-{os.getpid()}")
+        # Vectors first, keys last: a shard only counts once its keys file exists,
+        # so a run killed mid-write never leaves a half-written shard in use.
+        for suffix, array in ((".npy", vectors), (".keys.npy", np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 16))):
+            tmp = stem + ".tmp" + suffix
+            np.save(tmp, array)
+            os.replace(tmp, stem + suffix)
+        return stem
@@ -0,0 +1,121 @@
+import asyncio
+import itertools
+import math
+import time
+import uuid
+from collections import deque
+
+# Lower runs first. Re-classifications after an edit already have a severity,
+# so they wait behind bugs nobody has triaged yet.
+PRIORITIES = {"normal": 0, "low": 1}
+
+
+class QueueFull(Exception):
+    """Raised when a job cannot be admitted; carries a Retry-After hint in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Classification queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """
+    Bounded priority queue of classification jobs drained by a fixed worker pool.
+
+    At most `max_depth` jobs wait at once; low-priority jobs are only admitted
+    while the queue is below `low_priority_share` of that, so a burst of edits
+    cannot crowd out new reports. Finished jobs are kept for `ttl` seconds.
+    """
+
+    def __init__(self, process, max_depth=1000, workers=32, ttl=600, low_priority_share=0.8):
+        # `process` is an async callable turning one submitted item into its result.
+        self.process = process
+        self.max_depth = max_depth
+        self.worker_count = workers
+        self.ttl = ttl
+        self.low_priority_limit = int(max_depth * low_priority_share)
+        self.jobs = {}
+        self._finished = deque()
+        self.queue = None
+        self._order = itertools.count()
+        self._workers = []
+        # Smoothed seconds per job, for Retry-After.
+        self._job_seconds = 1.0
+
+    async def start(self):
+        self.queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def depth(self):
+        return self.queue.qsize() if self.queue else 0
+
+    def submit(self, item, priority="normal"):
+        self._purge()
+        depth = self.depth()
+        limit = self.max_depth if priority == "normal" else self.low_priority_limit
+        if depth >= limit:
+            raise QueueFull(self.retry_after(depth))
+
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {
+            "id": job_id,
+            "status": "queued",
+            "priority": priority,
+            "created": time.time(),
+            "finished": None,
+            "result": None,
+            "error": None,
+        }
+        self.queue.put_nowait((PRIORITIES[priority], next(self._order), job_id, item))
+        return self.jobs[job_id]
+
+    def get(self, job_id):
+        self._purge()
+        return self.jobs.get(job_id)
+
+    def retry_after(self, depth=None):
+        depth = self.depth() if depth is None else depth
+        # Roughly how long until the current backlog has drained.
+        return max(1, math.ceil(depth * self._job_seconds / self.worker_count))
+
+    def stats(self):
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for job in self.jobs.values():
+            counts[job["status"]] += 1
+        return {
+            **counts,
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "workers": self.worker_count,
+            "avg_job_s": round(self._job_seconds, 4),
+        }
+
+    async def _work(self):
+        while True:
+            _, _, job_id, item = await self.queue.get()
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            job["status"] = "running"
+            start = time.perf_counter()
+            try:
+                job["result"] = await self.process(item)
+                job["status"] = "done"
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = {"status": getattr(e, "status_code", 500), "detail": getattr(e, "detail", str(e))}
+            job["finished"] = time.time()
+            self._finished.append((job["finished"], job_id))
+            self._job_seconds = 0.9 * self._job_seconds + 0.1 * (time.perf_counter() - start)
+
+    def _purge(self):
+        # Jobs finish in order, so expired ones are always at the front.
+        cutoff = time.time() - self.ttl
+        while self._finished and self._finished[0][0] < cutoff:
+            _, job_id = self._finished.popleft()
+            self.jobs.pop(job_id, None)
@@ -1,69 +1,297 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import requests
+import asyncio
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Literal
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel
 
-app = FastAPI()
+from app.batching import MicroBatcher
+from app.cache import ResultCache
+from app import metrics
+from app.engines import EngineError, FallbackEngine, load_engine, run_answer, run_predict
+from app.jobs import JobQueue, QueueFull
+from app.profiler import SamplingProfiler
 
 # CONFIGURATION
-HF_TOKEN = os.getenv("HF_TOKEN")
-# Using the multilingual DeBERTa model
-API_URL = "https://router.huggingface.co/hf-inference/models/facebook/bart-large-mnli"
-headers = {"Authorization": f"Bearer {HF_TOKEN}"}
+# TRIAGE_ENGINE=auto (default) classifies in-process: the ONNX export when
+# present, else model_v2.joblib. TRIAGE_ENGINE=remote proxies Hugging Face
+# zero-shot (needs HF_TOKEN).
+# Micro-batching trades a few ms of latency for one model call per burst.
+BATCH_MAX_SIZE = int(os.getenv("TRIAGE_BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("TRIAGE_BATCH_MAX_WAIT_MS", "5"))
+BATCH_REQUEST_LIMIT = int(os.getenv("TRIAGE_BATCH_REQUEST_LIMIT", "256"))
+# Results are cached per engine version; TRIAGE_CACHE_DB="" keeps it memory-only.
+CACHE_SIZE = int(os.getenv("TRIAGE_CACHE_SIZE", "10000"))
+CACHE_TTL_S = float(os.getenv("TRIAGE_CACHE_TTL_S", "3600"))
+CACHE_DB = os.getenv("TRIAGE_CACHE_DB", "cache/results.sqlite3")
+CACHE_DISK_TTL_S = float(os.getenv("TRIAGE_CACHE_DISK_TTL_S", str(30 * 24 * 3600)))
+CACHE_DISK_MAX_ENTRIES = int(os.getenv("TRIAGE_CACHE_DISK_MAX_ENTRIES", "1000000"))
+CACHE_PRUNE_INTERVAL_S = float(os.getenv("TRIAGE_CACHE_PRUNE_INTERVAL_S", "300"))
+# Async jobs: a bounded queue answers 429 + Retry-After instead of piling up.
+JOB_QUEUE_MAX = int(os.getenv("TRIAGE_JOB_QUEUE_MAX", "1000"))
+JOB_WORKERS = int(os.getenv("TRIAGE_JOB_WORKERS", "32"))
+JOB_TTL_S = float(os.getenv("TRIAGE_JOB_TTL_S", "600"))
+# TRIAGE_PROFILE=1 samples every thread's stack; folded stacks at /debug/profile.
+PROFILE = os.getenv("TRIAGE_PROFILE", "") == "1"
+PROFILE_INTERVAL_MS = float(os.getenv("TRIAGE_PROFILE_INTERVAL_MS", "10"))
+
+engine = None
+batcher = None
+cache = None
+jobs = None
+pruner = None
+profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000) if PROFILE else None
+# "starting" until the engine is loaded and has answered a warm-up inference;
+# /health and /classify report 503 until then.
+status = "starting"
+
+WARM_UP_BUGS = [("Checkout crashes", "Payment fails with a 500 error after submit.")] * 2
+
+
+async def warm_up():
+    # Runs after the server is accepting connections, so /health can say
+    # "starting" instead of the port looking dead during a slow model load.
+    global engine, batcher, cache, jobs, pruner, status
+    try:
+        engine = await asyncio.to_thread(load_engine)
+        await engine.start()
+        cache = ResultCache(
+            engine.version,
+            max_entries=CACHE_SIZE,
+            ttl=CACHE_TTL_S,
+            db_path=CACHE_DB or None,
+            disk_ttl=CACHE_DISK_TTL_S,
+            disk_max_entries=CACHE_DISK_MAX_ENTRIES,
+        )
+        pruner = asyncio.create_task(prune_cache())
+        batcher = MicroBatcher(
+            predict_batch,
+            max_batch_size=BATCH_MAX_SIZE,
+            max_wait_ms=BATCH_MAX_WAIT_MS,
+            max_concurrency=engine.max_concurrency,
+            on_batch=observe_batch,
+        )
+        await batcher.start()
+        jobs = JobQueue(run_job, max_depth=JOB_QUEUE_MAX, workers=JOB_WORKERS, ttl=JOB_TTL_S)
+        await jobs.start()
+        if engine.name != "remote":
+            # The first inference pays for lazy allocations; not on a user's request.
+            # Straight to the in-process model: "ok" must mean it answered, not
+            # that the Hugging Face fallback covered for it.
+            await run_predict(engine.primary if isinstance(engine, FallbackEngine) else engine, WARM_UP_BUGS)
+        status = "ok"
+        print(f"[ENGINE READY] {engine.name} ({engine.version})")
+    except Exception as e:
+        status = "failed"
+        print(f"[ENGINE LOAD FAILED]: {str(e)}")
+
+
+async def prune_cache():
+    # Keeps the SQLite tier inside its TTL and size bounds for as long as we run.
+    while True:
+        try:
+            removed = await asyncio.to_thread(cache.prune)
+            if removed:
+                print(f"[CACHE PRUNED] {removed} rows")
+        except Exception as e:
+            print(f"[CACHE PRUNE FAILED]: {str(e)}")
+        await asyncio.sleep(CACHE_PRUNE_INTERVAL_S)
+
+
+async def predict_batch(bugs):
+    # Tagged with the engine that answered: fallback answers are not the
+    # primary model's, so they are neither cached nor counted under its name.
+    labels, answered_by = await run_answer(engine, bugs)
+    return [(label, answered_by) for label in labels]
+
+
+def observe_batch(size, queued):
+    metrics.BATCH_SIZE.labels(engine.name).observe(size)
+    for seconds in queued:
+        metrics.observe_stage(engine.name, "queue", seconds)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if profiler:
+        profiler.start()
+    loader = asyncio.create_task(warm_up())
+    yield
+    loader.cancel()
+    await asyncio.gather(loader, return_exceptions=True)
+    if pruner:
+        pruner.cancel()
+        await asyncio.gather(pruner, return_exceptions=True)
+    if jobs:
+        await jobs.stop()
+    if batcher:
+        await batcher.stop()
+    if engine:
+        await engine.close()
+    if cache:
+        cache.close()
+    if profiler:
+        profiler.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.StageClock)
 
 class BugPayload(BaseModel):
     title: str
     description: str
 
+class BugBatchPayload(BaseModel):
+    bugs: List[BugPayload]
+
+class BugJobPayload(BugPayload):
+    # "low" for re-classifying an edited bug: it yields to first-time reports.
+    priority: Literal["normal", "low"] = "normal"
+
+def engine_label():
+    return engine.name if engine else "none"
+
+async def classify_bugs(bugs):
+    """
+    Cached severities where we have them; one batched model call for the rest.
+    Returns the severities, whether the cache answered all, some or none, and
+    the name of the engine that answered (the fallback's, if it had to step in).
+    Only the serving engine's own answers are cached, never the fallback's.
+    """
+    if status != "ok":
+        raise EngineError(503, "AI model is warming up")
+    label = engine.name
+    with metrics.stage_timer(engine.name, "normalize"):
+        keys = [cache.key(title, description) for title, description in bugs]
+    with metrics.stage_timer(engine.name, "cache"):
+        results = await asyncio.to_thread(cache.get_many, keys)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        predictions = await batcher.submit_many([bugs[i] for i in missing])
+        fresh = []
+        for i, (prediction, answered_by) in zip(missing, predictions):
+            results[i] = prediction
+            if answered_by.version == cache.version:
+                fresh.append((keys[i], prediction))
+            else:
+                label = answered_by.name
+        if fresh:
+            await asyncio.to_thread(cache.put_many, fresh)
+    if not bugs:
+        cache_result = "none"
+    elif missing:
+        cache_result = "miss" if len(missing) == len(bugs) else "partial"
+    else:
+        cache_result = "hit"
+    return results, cache_result, label
+
+async def handle(request, endpoint, bugs):
+    # Everything between the request arriving and the handler running is
+    # body parsing and validation.
+    started = time.perf_counter()
+    received = request.scope.get("triage.received", started)
+    metrics.observe_stage(engine_label(), "parse", started - received)
+    outcome, cache_result, label = 500, "none", engine_label()
+    try:
+        results, cache_result, label = await classify_bugs(bugs)
+        outcome = 200
+        return results
+
+    except EngineError as e:
+        outcome = e.status_code
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        print(f"[AI CRASH]: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        metrics.observe_request(label, endpoint, outcome, cache_result, time.perf_counter() - received)
+        request.scope["triage.engine"] = label
+        request.scope["triage.handled"] = time.perf_counter()
+
+async def run_job(bug):
+    started = time.perf_counter()
+    outcome, cache_result, label = 500, "none", engine_label()
+    try:
+        results, cache_result, label = await classify_bugs([bug])
+        outcome = 200
+        return {"severity": results[0]}
+    except EngineError as e:
+        outcome = e.status_code
+        raise
+    finally:
+        metrics.observe_request(label, "job", outcome, cache_result, time.perf_counter() - started)
+
+def job_view(job):
+    return {k: job[k] for k in ("id", "status", "priority", "result", "error")}
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    if status != "ok":
+        return JSONResponse(status_code=503, content={"status": status})
+    return {"status": "ok", "engine": engine.name}
+
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/debug/profile")
+def get_profile(reset: bool = False):
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is off; set TRIAGE_PROFILE=1")
+    folded = profiler.folded()
+    if reset:
+        profiler.reset()
+    return PlainTextResponse(folded)
+
+@app.get("/classify/jobs/stats")
+def job_stats():
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="AI model is warming up")
+    return jobs.stats()
+
+@app.get("/cache/stats")
+def cache_stats():
+    if cache is None:
+        raise HTTPException(status_code=503, detail="AI model is warming up")
+    return cache.stats()
 
 @app.post("/classify")
-def classify(payload: BugPayload):
-    text = f"Title: {payload.title}. Description: {payload.description}"
-    candidate_labels = ["High", "Normal", "Low"]
+async def classify(payload: BugPayload, request: Request):
+    predictions = await handle(request, "classify", [(payload.title, payload.description)])
+    return {"severity": predictions[0]}
+
+@app.post("/classify/batch")
+async def classify_batch(payload: BugBatchPayload, request: Request):
+    if len(payload.bugs) > BATCH_REQUEST_LIMIT:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_REQUEST_LIMIT} bugs per request")
+
+    predictions = await handle(request, "batch", [(bug.title, bug.description) for bug in payload.bugs])
+    return {"results": [{"severity": prediction} for prediction in predictions]}
 
+@app.post("/classify/jobs", status_code=202)
+async def submit_job(payload: BugJobPayload):
+    if status != "ok":
+        raise HTTPException(status_code=503, detail="AI model is warming up", headers={"Retry-After": "5"})
     try:
-        response = requests.post(
-            API_URL, 
-            headers=headers, 
-            json={
-                "inputs": text,
-                "parameters": {"candidate_labels": candidate_labels},
-                "options": {"wait_for_model": True}
-            },
-            timeout=40 
-        )
-        
-        # 1. Handle non-200 responses (like HF 503)
-        if response.status_code != 200:
-            print(f"[HF STATUS {response.status_code}]: {response.text}")
-            raise HTTPException(status_code=503, detail="AI Model is warming up on Hugging Face")
-
-        result = response.json()
-
-        # 2. Handle specific "Model Loading" dictionary from Hugging Face
-        if isinstance(result, dict) and "error" in result:
-            # If the error contains "loading", return 503 to trigger backend retry
-            if "loading" in result["error"].lower():
-                raise HTTPException(status_code=503, detail="Model currently loading")
-            raise HTTPException(status_code=500, detail=result["error"])
-
-        # 3. Parse success response
-        if isinstance(result, list):
-            prediction = result[0]['label']
-        elif isinstance(result, dict) and 'labels' in result:
-            prediction = result['labels'][0]
-        else:
-            raise Exception("Invalid response format from HF Inference API")
-
-        return {"severity": prediction}
-
-    except requests.exceptions.Timeout:
-        raise HTTPException(status_code=504, detail="Hugging Face Timeout")
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[AI CRASH]: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        job = jobs.submit((payload.title, payload.description), payload.priority)
+    except QueueFull as e:
+        metrics.observe_request(engine_label(), "job", 429, "none", 0)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return JSONResponse(
+        status_code=202,
+        content=job_view(job),
+        headers={"Location": f"/classify/jobs/{job['id']}"},
+    )
+
+@app.get("/classify/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get(job_id) if jobs else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    headers = {}
+    if job["status"] in ("queued", "running"):
+        headers["Retry-After"] = str(jobs.retry_after())
+    return JSONResponse(content=job_view(job), headers=headers)
@@ -0,0 +1,83 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Histogram
+
+# Metrics are per process; with several uvicorn workers, scrape each one or
+# run prometheus_client in multiprocess mode (PROMETHEUS_MULTIPROC_DIR).
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0,
+)
+
+REQUESTS = Counter(
+    "triage_requests_total",
+    "Classification requests by engine, endpoint, HTTP outcome and cache result.",
+    ["engine", "endpoint", "outcome", "cache"],
+)
+REQUEST_SECONDS = Histogram(
+    "triage_request_seconds",
+    "Handler time per classification request, parse to response built.",
+    ["engine", "endpoint", "outcome", "cache"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "triage_stage_seconds",
+    "Time per pipeline stage: parse, normalize, cache, queue, embed, predict, "
+    "tokenize, upstream, upstream_wait, response.",
+    ["engine", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+BATCH_SIZE = Histogram(
+    "triage_batch_size",
+    "Bugs per model call after micro-batching.",
+    ["engine"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+CACHE_LOOKUPS = Counter(
+    "triage_cache_lookups_total",
+    "Result cache lookups by tier that answered (memory, disk) or miss.",
+    ["result"],
+)
+
+
+@contextmanager
+def stage_timer(engine, stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(engine, stage).observe(time.perf_counter() - start)
+
+
+def observe_stage(engine, stage, seconds):
+    STAGE_SECONDS.labels(engine, stage).observe(seconds)
+
+
+def observe_request(engine, endpoint, outcome, cache, seconds):
+    REQUESTS.labels(engine, endpoint, str(outcome), cache).inc()
+    REQUEST_SECONDS.labels(engine, endpoint, str(outcome), cache).observe(seconds)
+
+
+class StageClock:
+    """
+    Pure ASGI middleware stamping when a request arrived, so handlers can time
+    body parsing/validation, and timing the response from the moment the
+    handler is done (`scope["triage.handled"]`) to the last body byte sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        scope["triage.received"] = time.perf_counter()
+
+        async def timed_send(message):
+            await send(message)
+            handled = scope.get("triage.handled")
+            if handled and message["type"] == "http.response.body" and not message.get("more_body"):
+                observe_stage(scope.get("triage.engine", "none"), "response", time.perf_counter() - handled)
+
+        await self.app(scope, receive, timed_send)
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class ThresholdPolicy:
+    """
+    "High if P(High) > threshold, else the most likely of the other classes",
+    applied to a whole `predict_proba` matrix at once.
+    """
+
+    def __init__(self, classes, threshold=0.3, positive="High"):
+        self.classes = np.asarray(classes)
+        self.threshold = threshold
+        self.positive = positive
+        self.positive_index = list(self.classes).index(positive)
+
+    def predict(self, probs):
+        probs = np.asarray(probs)
+        return self.classes[self.predict_index(probs)]
+
+    def predict_index(self, probs):
+        probs = np.asarray(probs)
+        flagged = probs[:, self.positive_index] > self.threshold
+        return np.where(flagged, self.positive_index, self.runner_up(probs))
+
+    def runner_up(self, probs):
+        # Best class with the positive one taken out of contention.
+        masked = np.where(np.arange(probs.shape[1]) == self.positive_index, -np.inf, probs)
+        return masked.argmax(axis=1)
+
+
+def sweep_thresholds(y_true, probs, classes, positive="High", thresholds=None):
+    """
+    Precision/recall of `positive` and overall accuracy of ThresholdPolicy for
+    every threshold in one sort, instead of re-running the policy per candidate.
+    Defaults to every distinct P(positive) in `probs`.
+
+    Works because only the positive flag depends on the threshold: the runner-up
+    label of each row is fixed, so each metric is a prefix sum over rows sorted
+    by P(positive).
+    """
+    policy = ThresholdPolicy(classes, positive=positive)
+    probs = np.asarray(probs)
+    y_true = np.asarray(y_true)
+    p_pos = probs[:, policy.positive_index]
+
+    is_pos = y_true == positive
+    runner_up_correct = policy.classes[policy.runner_up(probs)] == y_true
+
+    order = np.argsort(-p_pos, kind="stable")
+    p_desc = p_pos[order]
+    # cum_x[k] = sum over the k rows with the highest P(positive).
+    cum_tp = np.concatenate(([0], np.cumsum(is_pos[order])))
+    cum_runner_up = np.concatenate(([0], np.cumsum(runner_up_correct[order])))
+
+    if thresholds is None:
+        thresholds = np.unique(p_pos)
+    thresholds = np.asarray(thresholds, dtype=float)
+    # Rows flagged at threshold t are exactly those with P(positive) > t.
+    flagged = len(p_desc) - np.searchsorted(p_desc[::-1], thresholds, side="right")
+
+    tp = cum_tp[flagged]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(flagged > 0, tp / flagged, 0.0)
+        recall = tp / is_pos.sum() if is_pos.any() else np.zeros_like(tp, dtype=float)
+    accuracy = (tp + cum_runner_up[-1] - cum_runner_up[flagged]) / len(y_true)
+
+    return {
+        "threshold": thresholds,
+        "flagged": flagged,
+        "precision": precision,
+        "recall": recall,
+        "accuracy": accuracy,
+    }
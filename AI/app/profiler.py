@@ -0,0 +1,54 @@
+import sys
+import threading
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock sampler: every `interval` seconds a daemon thread
+    records the stack of every other thread. `folded()` returns the counts in
+    the "frame;frame;frame count" format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval=0.01, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="triage-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+    def folded(self):
+        with self.lock:
+            lines = [f"{stack} {count}" for stack, count in self.samples.most_common()]
+        return "\n".join(lines) + "\n"
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = []
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stacks.append(";".join(reversed(stack)))
+            with self.lock:
+                self.samples.update(stacks)
@@ -0,0 +1,148 @@
+import asyncio
+import time
+import httpx
+
+from app.engines import EngineError, LABELS
+from app.metrics import observe_stage, stage_timer
+
+
+class UpstreamClient:
+    """
+    Pooled, keep-alive async client for the Hugging Face zero-shot router.
+
+    At most `max_concurrency` upstream calls run at once, each attempt gets its
+    own `attempt_timeout`, and identical texts already in flight share one call
+    instead of being sent again. `deadline` caps a whole call, queueing and
+    retries included, so it gives up before the backend's own 45s timeout does.
+    """
+
+    def __init__(self, api_url, token, max_concurrency=64, attempt_timeout=20, attempts=2, deadline=40):
+        self.api_url = api_url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.attempt_timeout = attempt_timeout
+        self.attempts = attempts
+        self.deadline = deadline
+        self.max_concurrency = max_concurrency
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.client = None
+        self._inflight = {}
+        self._tasks = set()
+
+    async def start(self):
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+        )
+        self.client = httpx.AsyncClient(headers=self.headers, limits=limits, timeout=self.attempt_timeout)
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+
+    async def classify_many(self, texts):
+        loop = asyncio.get_running_loop()
+        futures = {}
+        fresh = []
+        for text in dict.fromkeys(texts):
+            if text not in self._inflight:
+                self._inflight[text] = loop.create_future()
+                fresh.append(text)
+            futures[text] = self._inflight[text]
+
+        if fresh:
+            # A task, not an await: if this caller is cancelled, whoever
+            # coalesced onto these texts still gets an answer.
+            task = asyncio.create_task(self._resolve(fresh))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return [await asyncio.shield(futures[text]) for text in texts]
+
+    async def _resolve(self, texts):
+        try:
+            labels = await self._call(texts)
+            for text, label in zip(texts, labels):
+                self._inflight[text].set_result(label)
+        except Exception as e:
+            for text in texts:
+                future = self._inflight[text]
+                if not future.done():
+                    future.set_exception(e)
+                    # Marked as seen so a result nobody waited for is not logged as lost.
+                    future.exception()
+        finally:
+            for text in texts:
+                future = self._inflight.pop(text)
+                if not future.done():
+                    future.cancel()
+
+    async def _call(self, texts):
+        inputs = texts[0] if len(texts) == 1 else texts
+        waiting = time.perf_counter()
+        deadline = waiting + self.deadline
+        async with self.slots:
+            observe_stage("remote", "upstream_wait", time.perf_counter() - waiting)
+            for attempt in range(1, self.attempts + 1):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise EngineError(504, "Hugging Face Timeout")
+                budget = min(self.attempt_timeout, remaining)
+                try:
+                    with stage_timer("remote", "upstream"):
+                        # httpx timeouts bound each connect/read/write on its own;
+                        # wait_for bounds the attempt as a whole, so a body that
+                        # trickles in still cannot outlast the deadline.
+                        response = await asyncio.wait_for(
+                            self.client.post(
+                                self.api_url,
+                                json={
+                                    "inputs": inputs,
+                                    "parameters": {"candidate_labels": LABELS},
+                                    "options": {"wait_for_model": True}
+                                },
+                                timeout=budget,
+                            ),
+                            budget,
+                        )
+                    break
+                except (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError) as e:
+                    if attempt == self.attempts:
+                        if isinstance(e, (asyncio.TimeoutError, httpx.TimeoutException)):
+                            raise EngineError(504, "Hugging Face Timeout")
+                        raise EngineError(503, f"Hugging Face unreachable: {e}")
+                    print(f"[HF RETRY {attempt}/{self.attempts}]: {type(e).__name__}")
+
+        # 1. Handle non-200 responses (like HF 503)
+        if response.status_code != 200:
+            print(f"[HF STATUS {response.status_code}]: {response.text}")
+            raise EngineError(503, "AI Model is warming up on Hugging Face")
+
+        result = response.json()
+        if len(texts) == 1:
+            return [parse_zero_shot(result)]
+
+        # The router answers a list of inputs with one result per input, in order.
+        check_hf_error(result)
+        if not isinstance(result, list) or len(result) != len(texts):
+            raise EngineError(500, "Invalid response format from HF Inference API")
+        return [parse_zero_shot(item) for item in result]
+
+
+def check_hf_error(result):
+    # 2. Handle specific "Model Loading" dictionary from Hugging Face
+    if isinstance(result, dict) and "error" in result:
+        # If the error contains "loading", return 503 to trigger backend retry
+        if "loading" in str(result["error"]).lower():
+            raise EngineError(503, "Model currently loading")
+        raise EngineError(500, result["error"])
+
+
+def parse_zero_shot(result):
+    check_hf_error(result)
+
+    # 3. Parse success response
+    if isinstance(result, list):
+        return result[0]['label']
+    if isinstance(result, dict) and 'labels' in result:
+        return result['labels'][0]
+    raise EngineError(500, "Invalid response format from HF Inference API")
@@ -1,14 +1,66 @@
+import multiprocessing
+import os
 import re
-import spacy
+from collections import OrderedDict
 
-nlp = spacy.load("en_core_web_sm", disable=["parser", "ner"])
+URLS_AND_EMAILS = re.compile(r'https?://\S+|www\.\S+|\S+@\S+')
+NON_ALNUM = re.compile(r'[^a-z0-9\s]')
+WHITESPACE = re.compile(r'\s+')
 
-def normalize_text(text):
+# Bug text repeats a lot (templates, duplicates), so finished lemma strings are
+# kept per cleaned text, bounded so a huge corpus cannot grow it without limit.
+LEMMA_CACHE_SIZE = 50000
+_lemma_cache = OrderedDict()
+
+_nlp = None
+
+def get_nlp():
+    # Loaded on first use so importing this module (e.g. for clean_text) stays cheap.
+    global _nlp
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load("en_core_web_sm", disable=["parser", "ner"])
+    return _nlp
+
+def default_n_process():
+    # Under "spawn"/"forkserver" workers re-import the calling script, which the
+    # top-level training scripts are not written for; stay single-process there.
+    if multiprocessing.get_start_method() != "fork":
+        return 1
+    return os.cpu_count() or 1
+
+def clean_text(text):
     if not isinstance(text, str): return ""
     text = text.lower()
-    text = re.sub(r'https?://\S+|www\.\S+|\S+@\S+', ' ', text)
-    text = re.sub(r'[^a-z0-9\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    doc = nlp(text)
-    tokens = [token.lemma_ for token in doc if not token.is_stop and token.lemma_.strip()]
-    return " ".join(tokens)
\ No newline at end of file
+    text = URLS_AND_EMAILS.sub(' ', text)
+    text = NON_ALNUM.sub(' ', text)
+    text = WHITESPACE.sub(' ', text).strip()
+    return text
+
+def normalize_texts(texts, batch_size=1000, n_process=1):
+    """
+    Streams normalized texts, in input order, through one `nlp.pipe`.
+    Cached texts are passed to spaCy as "" so they keep their place in the
+    stream without costing a parse.
+    """
+    def feed():
+        for text in texts:
+            cleaned = clean_text(text)
+            cached = _lemma_cache.get(cleaned)
+            if cached is not None:
+                _lemma_cache.move_to_end(cleaned)
+                yield "", (cleaned, cached)
+            else:
+                yield cleaned, (cleaned, None)
+
+    docs = get_nlp().pipe(feed(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+    for doc, (cleaned, cached) in docs:
+        if cached is None:
+            cached = " ".join(token.lemma_ for token in doc if not token.is_stop and token.lemma_.strip())
+            _lemma_cache[cleaned] = cached
+            if len(_lemma_cache) > LEMMA_CACHE_SIZE:
+                _lemma_cache.popitem(last=False)
+        yield cached
+
+def normalize_text(text):
+    return next(normalize_texts([text]))
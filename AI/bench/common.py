@@ -0,0 +1,69 @@
+import json
+import os
+import platform
+import subprocess
+import time
+import numpy as np
+import pandas as pd
+
+from app.corpus import SOURCES, load_bug_reports
+
+RESULTS_DIR = "bench/results"
+
+
+def load_texts(n=2000, seed=42):
+    """
+    Real bug texts from RawData/*.csv (Bugzilla exports + ModernBugs), sampled
+    with a fixed seed so every run and every commit measures the same inputs.
+    Each item is a (title, description) pair, as the API receives it.
+    """
+    bugs = load_bug_reports(SOURCES)
+    pairs = list(zip(bugs['sd'].fillna('').astype(str), bugs['dt'].fillna('').astype(str)))
+    modern = pd.read_csv("RawData/ModernBugs.csv")
+    pairs += [(text, "") for text in modern.iloc[:, 0].astype(str)]
+
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(pairs), size=n, replace=n > len(pairs))
+    return [pairs[i] for i in picks]
+
+
+def latency_summary(seconds):
+    ms = np.asarray(seconds) * 1000
+    if not len(ms):
+        return {}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(len(ms)),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(kind, params, results, out=None):
+    report = {
+        "kind": kind,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{kind}-{report['commit'] or 'nogit'}-{int(time.time())}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved: {out}")
+    return out
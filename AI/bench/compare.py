@@ -0,0 +1,42 @@
+"""
+Side-by-side diff of two saved benchmark runs (e.g. before/after a commit):
+
+    python -m bench.compare bench/results/micro-abc123-*.json bench/results/micro-def456-*.json
+"""
+import argparse
+import json
+
+
+def flatten(node, prefix=""):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, node
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+    if old["kind"] != new["kind"]:
+        raise SystemExit(f"Cannot compare a {old['kind']} run with a {new['kind']} run.")
+
+    print(f"{old['kind']}: {old['commit']} -> {new['commit']}")
+    old_values = dict(flatten(old["results"]))
+    for key, value in flatten(new["results"]):
+        if key not in old_values:
+            continue
+        base = old_values[key]
+        change = f"{(value - base) / base * 100:+.1f}%" if base else "n/a"
+        print(f"{key:55} {base:>12} {value:>12} {change:>9}")
+
+
+if __name__ == "__main__":
+    main()
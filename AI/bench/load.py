@@ -0,0 +1,130 @@
+"""
+HTTP load generator for POST /classify at a fixed concurrency:
+
+    python -m bench.load --concurrency 64 --requests 2000
+
+Without --url it starts stub_hf.py and the API (TRIAGE_ENGINE=remote, result
+cache off) on local ports, so the numbers measure the service itself rather
+than Hugging Face or cache luck. Pass --engine local/onnx to load the
+in-process models instead, or --url to drive an already running service.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+import httpx
+
+from bench.common import latency_summary, load_texts, save_results
+
+
+def spawn(args):
+    env = dict(os.environ)
+    env.update({
+        "STUB_LATENCY_MS": str(args.stub_latency_ms),
+        "HF_API_URL": f"http://127.0.0.1:{args.stub_port}/",
+        "TRIAGE_ENGINE": args.engine,
+        "TRIAGE_CACHE_SIZE": "0",
+        "TRIAGE_CACHE_DB": "",
+    })
+    quiet = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    uvicorn = [sys.executable, "-m", "uvicorn", "--log-level", "warning"]
+    procs = []
+    if args.engine == "remote":
+        procs.append(subprocess.Popen(uvicorn + ["stub_hf:app", "--port", str(args.stub_port)], env=env, **quiet))
+    procs.append(subprocess.Popen(uvicorn + ["app.main:app", "--port", str(args.port)], env=env, **quiet))
+    return procs
+
+
+async def wait_ready(client, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit("Service did not become healthy in time.")
+
+
+async def drive(client, bugs, concurrency):
+    latencies = {}
+    statuses = Counter()
+    next_index = iter(range(len(bugs)))
+
+    async def worker():
+        for i in next_index:
+            title, description = bugs[i]
+            start = time.perf_counter()
+            try:
+                response = await client.post("/classify", json={"title": title, "description": description})
+                status = response.status_code
+            except httpx.TimeoutException:
+                status = "timeout"
+            except httpx.TransportError:
+                status = "error"
+            latencies.setdefault(status, []).append(time.perf_counter() - start)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return elapsed, latencies, statuses
+
+
+async def run(args):
+    bugs = load_texts(args.requests + args.warmup, args.seed)
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    procs = [] if args.url else spawn(args)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            await wait_ready(client)
+            if args.warmup:
+                await drive(client, bugs[:args.warmup], args.concurrency)
+            elapsed, latencies, statuses = await drive(client, bugs[args.warmup:], args.concurrency)
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+    ok = latencies.get(200, [])
+    all_latencies = [t for ts in latencies.values() for t in ts]
+    results = {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 1),
+        "ok_throughput_rps": round(len(ok) / elapsed, 1),
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "latency": latency_summary(all_latencies),
+        "latency_ok": latency_summary(ok),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Drive an already running service instead of spawning one")
+    parser.add_argument("--engine", default="remote", choices=["remote", "local", "onnx"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stub-port", type=int, default=8766)
+    parser.add_argument("--stub-latency-ms", type=float, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    latency = results["latency"]
+    print(f"{results['throughput_rps']} req/s over {results['elapsed_s']} s  statuses={results['statuses']}")
+    print(f"p50={latency['p50_ms']} ms  p95={latency['p95_ms']} ms  p99={latency['p99_ms']} ms")
+    save_results("load", vars(args), results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Micro-benchmarks for each classification stage at several batch sizes:
+
+    python -m bench.micro --batch-sizes 1 8 32 128 --repeats 10
+
+Stages whose model or dependency is missing are skipped, not failed.
+"""
+import argparse
+import os
+import time
+import numpy as np
+
+from bench.common import latency_summary, load_texts, save_results
+
+
+def setup_normalize(texts):
+    from app import utils
+
+    utils.get_nlp()
+
+    def run(batch):
+        # Cold every time: the lemma cache would otherwise turn repeats into lookups.
+        utils._lemma_cache.clear()
+        return list(utils.normalize_texts(batch))
+    return run
+
+
+def setup_tfidf(texts):
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    if os.path.exists("app/triage_vectorizer.joblib"):
+        tfidf = joblib.load("app/triage_vectorizer.joblib")
+    else:
+        # Same settings as trainmodel_f.py, fitted on the benchmark texts.
+        tfidf = TfidfVectorizer(max_features=5000, ngram_range=(1, 2)).fit(texts)
+    return tfidf.transform
+
+
+def setup_encode(texts):
+    from sentence_transformers import SentenceTransformer
+    from app.engines import EMBEDDER_NAME
+
+    embedder = SentenceTransformer(EMBEDDER_NAME, device="cpu")
+    return lambda batch: embedder.encode(batch, batch_size=len(batch), show_progress_bar=False)
+
+
+def setup_predict_proba(texts):
+    import joblib
+    from app.engines import MODEL_PATH
+
+    model = joblib.load(MODEL_PATH)
+    # The head's cost does not depend on what the vectors say, only their shape.
+    vectors = np.random.default_rng(0).normal(size=(len(texts), model.n_features_in_)).astype(np.float32)
+    index = {text: i for i, text in enumerate(texts)}
+    return lambda batch: model.predict_proba(vectors[[index[text] for text in batch]])
+
+
+def setup_onnx(texts):
+    from app.engines import OnnxEngine
+
+    engine = OnnxEngine()
+    return lambda batch: engine.predict([(text, "") for text in batch])
+
+
+STAGES = {
+    "normalize_text": setup_normalize,
+    "tfidf_transform": setup_tfidf,
+    "embedding_encode": setup_encode,
+    "predict_proba": setup_predict_proba,
+    "onnx_pipeline": setup_onnx,
+}
+
+
+def bench_stage(run, texts, batch_size, repeats):
+    def batch_for(r):
+        return [texts[(r * batch_size + i) % len(texts)] for i in range(batch_size)]
+
+    run(batch_for(repeats))  # warm-up, on inputs the timed runs do not reuse
+    timings = []
+    for r in range(repeats):
+        batch = batch_for(r)
+        start = time.perf_counter()
+        run(batch)
+        timings.append(time.perf_counter() - start)
+    summary = latency_summary(timings)
+    summary["items_per_s"] = round(batch_size * repeats / sum(timings), 1)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 128])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    texts = [f"{title} {description}" for title, description in load_texts(args.texts, args.seed)]
+    results = {}
+    for name in args.stages:
+        try:
+            run = STAGES[name](texts)
+        except Exception as e:
+            print(f"[SKIP] {name}: {e}")
+            continue
+        results[name] = {}
+        for batch_size in args.batch_sizes:
+            summary = bench_stage(run, texts, batch_size, args.repeats)
+            results[name][str(batch_size)] = summary
+            print(f"{name:18} batch={batch_size:<5} p50={summary['p50_ms']:>9.3f} ms  "
+                  f"p95={summary['p95_ms']:>9.3f} ms  {summary['items_per_s']:>10.1f} items/s")
+
+    save_results("micro", vars(args), results, args.out)
+
+
+if __name__ == "__main__":
+    main()
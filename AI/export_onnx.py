@@ -0,0 +1,101 @@
+import json
+import os
+import numpy as np
+import joblib
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from sentence_transformers import SentenceTransformer
+from sentence_transformers.models import Normalize
+
+# Folds the trainmodel_new.py pipeline (MiniLM encoder -> mean pooling ->
+# normalize -> logistic regression) into one int8 ONNX graph that the API can
+# serve through onnxruntime (TRIAGE_ENGINE=onnx) without torch.
+
+# 1. CONFIGURATION
+EMBEDDER = 'all-MiniLM-L6-v2'
+HEAD_PATH = "app/model_v2.joblib"
+FP32_PATH = "app/triage_v2.fp32.onnx"
+ONNX_PATH = "app/triage_v2.onnx"
+TOKENIZER_PATH = "app/triage_v2.tokenizer.json"
+META_PATH = "app/triage_v2.json"
+
+
+class TriagePipeline(torch.nn.Module):
+    def __init__(self, embedder, head):
+        super().__init__()
+        self.encoder = embedder[0].auto_model
+        self.normalize = any(isinstance(module, Normalize) for module in embedder)
+        self.register_buffer("coef", torch.tensor(head.coef_, dtype=torch.float32))
+        self.register_buffer("intercept", torch.tensor(head.intercept_, dtype=torch.float32))
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        hidden = self.encoder(
+            input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+        )[0]
+        # Mean pooling over real tokens only, as sentence-transformers does.
+        mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        if self.normalize:
+            pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        # Multinomial logistic regression == softmax of the linear scores.
+        return torch.softmax(pooled @ self.coef.T + self.intercept, dim=1)
+
+
+# 2. LOAD
+print("Loading embedder and classifier head...")
+embedder = SentenceTransformer(EMBEDDER, device="cpu")
+head = joblib.load(HEAD_PATH)
+if len(head.classes_) < 3:
+    raise SystemExit("Expected a multinomial head with 3 classes.")
+pipeline = TriagePipeline(embedder, head).eval()
+
+# 3. EXPORT
+print("Exporting ONNX graph...")
+tokenizer = embedder.tokenizer
+sample = tokenizer(["Checkout crashes", "Typo in footer text"], padding=True, return_tensors="pt")
+torch.onnx.export(
+    pipeline,
+    (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+    FP32_PATH,
+    input_names=["input_ids", "attention_mask", "token_type_ids"],
+    output_names=["probabilities"],
+    dynamic_axes={
+        "input_ids": {0: "batch", 1: "sequence"},
+        "attention_mask": {0: "batch", 1: "sequence"},
+        "token_type_ids": {0: "batch", 1: "sequence"},
+        "probabilities": {0: "batch"},
+    },
+    opset_version=17,
+)
+
+# 4. QUANTIZE (int8 weights, activations quantized on the fly)
+print("Quantizing to int8...")
+quantize_dynamic(FP32_PATH, ONNX_PATH, weight_type=QuantType.QInt8)
+os.remove(FP32_PATH)
+tokenizer.backend_tokenizer.save(TOKENIZER_PATH)
+with open(META_PATH, "w") as f:
+    json.dump({
+        "classes": [str(c) for c in head.classes_],
+        "max_length": embedder.max_seq_length,
+        "embedder": EMBEDDER,
+    }, f, indent=2)
+
+# 5. CHECK AGAINST THE ORIGINAL PIPELINE
+import onnxruntime as ort
+
+texts = [
+    "Critical Memory leak in Auth Service preventing syncing logs.",
+    "Styling: Navbar padding is slightly off-center.",
+    "The Submit button is broken when uploading files.",
+]
+expected = head.predict_proba(embedder.encode(texts))
+batch = tokenizer(texts, padding=True, truncation=True, max_length=embedder.max_seq_length, return_tensors="np")
+session = ort.InferenceSession(ONNX_PATH, providers=["CPUExecutionProvider"])
+actual = session.run(None, {
+    "input_ids": batch["input_ids"].astype(np.int64),
+    "attention_mask": batch["attention_mask"].astype(np.int64),
+    "token_type_ids": batch["token_type_ids"].astype(np.int64),
+})[0]
+print(f"Max |P(onnx int8) - P(torch)|: {np.abs(actual - expected).max():.4f}")
+print(f"Same labels: {(actual.argmax(1) == expected.argmax(1)).all()}")
+print(f"Saved: {ONNX_PATH} ({os.path.getsize(ONNX_PATH) / 1e6:.1f} MB), {TOKENIZER_PATH}, {META_PATH}")
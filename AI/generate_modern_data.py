@@ -1,53 +1,222 @@
+import argparse
+import io
+import multiprocessing
+from collections import deque
+import string
+import numpy as np
 import pandas as pd
 import random
 
-def generate_data():
-    # Large pool of varied templates to prevent overfitting
-    templates = {
-        "High": [
-            "Critical {issue} in {component} preventing {action}.",
-            "Security alert: {issue} detected. Potential {impact}.",
-            "System is {impact} because of {issue}.",
-            "Emergency: {issue} is causing {impact} for all users.",
-            "Immediate attention required: {component} {ui_issue}."
-        ],
-        "Normal": [
-            "Functional bug: {action} in {component} is {ui_issue}.",
-            "The {ui_element} is {ui_issue} when {action}.",
-            "Interface error: {ui_element} overlaps with {ui_element}.",
-            "Standard issue: {action} doesn't work as expected in {component}.",
-            "Logic error in {component} while {action}."
-        ],
-        "Low": [
-            "Cosmetic: Typo in {component} - '{word1}' should be '{word2}'.",
-            "Styling: {ui_element} padding is slightly {ui_issue}.",
-            "Request: Could we update the {ui_element} to be more {impact}?",
-            "Minor {ui_element} misalignment in the {component} view.",
-            "Text correction: Found '{word1}' instead of '{word2}' in the footer."
-        ]
-    }
-
-    keywords = {
-        "issue": ["SQL injection", "Memory leak", "Database timeout", "500 Error", "Auth bypass", "Deadlock"],
-        "component": ["Payment Module", "Auth Service", "Prisma Layer", "React Store", "API Gateway", "S3 Bucket"],
-        "impact": ["completely unresponsive", "leaking credentials", "crashing production", "dropping connections"],
-        "action": ["verifying JWT", "processing checkout", "fetching user data", "syncing logs", "uploading files"],
-        "ui_element": ["Submit button", "Navbar", "Footer", "Avatar upload", "Dashboard card"],
-        "ui_issue": ["failing", "broken", "off-center", "unresponsive", "missing", "lagging"],
-        "word1": ["Recieve", "Proccess", "Comit", "Loggin"],
-        "word2": ["Receive", "Process", "Commit", "Login"]
-    }
+# Large pool of varied templates to prevent overfitting
+TEMPLATES = {
+    "High": [
+        "Critical {issue} in {component} preventing {action}.",
+        "Security alert: {issue} detected. Potential {impact}.",
+        "System is {impact} because of {issue}.",
+        "Emergency: {issue} is causing {impact} for all users.",
+        "Immediate attention required: {component} {ui_issue}."
+    ],
+    "Normal": [
+        "Functional bug: {action} in {component} is {ui_issue}.",
+        "The {ui_element} is {ui_issue} when {action}.",
+        "Interface error: {ui_element} overlaps with {ui_element}.",
+        "Standard issue: {action} doesn't work as expected in {component}.",
+        "Logic error in {component} while {action}."
+    ],
+    "Low": [
+        "Cosmetic: Typo in {component} - '{word1}' should be '{word2}'.",
+        "Styling: {ui_element} padding is slightly {ui_issue}.",
+        "Request: Could we update the {ui_element} to be more {impact}?",
+        "Minor {ui_element} misalignment in the {component} view.",
+        "Text correction: Found '{word1}' instead of '{word2}' in the footer."
+    ]
+}
+
+KEYWORDS = {
+    "issue": ["SQL injection", "Memory leak", "Database timeout", "500 Error", "Auth bypass", "Deadlock"],
+    "component": ["Payment Module", "Auth Service", "Prisma Layer", "React Store", "API Gateway", "S3 Bucket"],
+    "impact": ["completely unresponsive", "leaking credentials", "crashing production", "dropping connections"],
+    "action": ["verifying JWT", "processing checkout", "fetching user data", "syncing logs", "uploading files"],
+    "ui_element": ["Submit button", "Navbar", "Footer", "Avatar upload", "Dashboard card"],
+    "ui_issue": ["failing", "broken", "off-center", "unresponsive", "missing", "lagging"],
+    "word1": ["Recieve", "Proccess", "Comit", "Loggin"],
+    "word2": ["Receive", "Process", "Commit", "Login"]
+}
+
+# Severity-neutral follow-up sentences, appended to stretch reports to a
+# realistic length distribution without changing what the label depends on.
+DETAIL_TEMPLATES = [
+    "Steps to reproduce: open the {component} and try {action}.",
+    "Observed while {action} on the {ui_element}.",
+    "Logs from the {component} attached.",
+    "Happens every time after {action}.",
+    "Seen on staging and production for the {component}."
+]
+
 
+def generate_data():
     generated = []
-    for severity, list_of_templates in templates.items():
+    for severity, list_of_templates in TEMPLATES.items():
         for _ in range(500): # 500 samples per class = 1500 total
             template = random.choice(list_of_templates)
-            entry = template.format(**{k: random.choice(v) for k, v in keywords.items()})
+            entry = template.format(**{k: random.choice(v) for k, v in KEYWORDS.items()})
             generated.append({"text": entry, "severity": severity})
 
     df = pd.DataFrame(generated)
     df.to_csv("RawData/ModernBugs.csv", index=False)
     print("Generated 1500 high-variety samples.")
 
+
+# --- STREAMING MODE (million-row corpora) ---
+
+KEYWORD_VALUES = {k: np.array(v, dtype=object) for k, v in KEYWORDS.items()}
+
+
+def compile_template(template):
+    # "a {x} b {y}." -> [("a ", "x"), (" b ", "y"), (".", None)]
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+
+COMPILED = {severity: [compile_template(t) for t in ts] for severity, ts in TEMPLATES.items()}
+COMPILED_DETAILS = [compile_template(t) for t in DETAIL_TEMPLATES]
+
+
+def render(parts, rng, n):
+    # One keyword draw per placeholder and row: each {ui_element} is drawn
+    # separately, as str.format with a fresh random.choice per key would not be.
+    text = np.full(n, "", dtype=object)
+    for literal, field in parts:
+        text = text + literal
+        if field is not None:
+            values = KEYWORD_VALUES[field]
+            text = text + values[rng.integers(0, len(values), size=n)]
+    return text
+
+
+def render_grouped(compiled, choice, rng):
+    text = np.empty(len(choice), dtype=object)
+    for i, parts in enumerate(compiled):
+        rows = np.flatnonzero(choice == i)
+        if len(rows):
+            text[rows] = render(parts, rng, len(rows))
+    return text
+
+
+def generate_chunk(task):
+    """
+    Builds chunk `index` of the corpus as CSV text. The RNG is seeded from
+    (seed, index), so the output is identical whatever the worker count.
+    """
+    index, rows, seed, mix, extra_mean, max_extra = task
+    rng = np.random.default_rng([seed, index])
+    severities = np.array(list(mix), dtype=object)
+    labels = severities[rng.choice(len(severities), size=rows, p=list(mix.values()))]
+
+    text = np.empty(rows, dtype=object)
+    for severity in severities:
+        members = np.flatnonzero(labels == severity)
+        if len(members):
+            templates = COMPILED[severity]
+            text[members] = render_grouped(templates, rng.integers(0, len(templates), size=len(members)), rng)
+
+    # Length distribution: Poisson(extra_mean) follow-up sentences per report.
+    if max_extra > 0 and extra_mean > 0:
+        extra = np.minimum(rng.poisson(extra_mean, size=rows), max_extra)
+        for slot in range(max_extra):
+            rows_needing = np.flatnonzero(extra > slot)
+            if not len(rows_needing):
+                break
+            detail = rng.integers(0, len(COMPILED_DETAILS), size=len(rows_needing))
+            text[rows_needing] = text[rows_needing] + " " + render_grouped(COMPILED_DETAILS, detail, rng)
+
+    buffer = io.StringIO()
+    pd.DataFrame({"text": text, "severity": labels}).to_csv(buffer, index=False, header=False)
+    return buffer.getvalue()
+
+
+def generate_stream(out, rows, seed=42, mix=None, chunk_rows=100000, workers=1, extra_mean=0.0, max_extra=0):
+    """
+    Writes `rows` synthetic reports to `out` chunk by chunk. Chunks are
+    generated on `workers` processes and written in order, with at most
+    2 * `workers` of them in flight, so memory stays at a few chunks no matter
+    how large the corpus is or how slow the disk.
+    """
+    mix = mix or {severity: 1 / len(TEMPLATES) for severity in TEMPLATES}
+    check_mix(mix)
+    total = sum(mix.values())
+    mix = {severity: share / total for severity, share in mix.items()}
+    tasks = [
+        (i, min(chunk_rows, rows - start), seed, mix, extra_mean, max_extra)
+        for i, start in enumerate(range(0, rows, chunk_rows))
+    ]
+
+    with open(out, "w", newline="") as f:
+        f.write("text,severity\n")
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                # imap would let workers run arbitrarily far ahead of the writer.
+                pending = deque()
+                queued = iter(tasks)
+                for task in queued:
+                    pending.append(pool.apply_async(generate_chunk, (task,)))
+                    if len(pending) == 2 * workers:
+                        break
+                written = 0
+                while pending:
+                    f.write(pending.popleft().get())
+                    written += 1
+                    print(f"\r{min(written * chunk_rows, rows):,}/{rows:,} rows", end="")
+                    task = next(queued, None)
+                    if task is not None:
+                        pending.append(pool.apply_async(generate_chunk, (task,)))
+        else:
+            for written, task in enumerate(tasks, 1):
+                f.write(generate_chunk(task))
+                print(f"\r{min(written * chunk_rows, rows):,}/{rows:,} rows", end="")
+    print(f"\nGenerated {rows:,} samples in {out}.")
+
+
+def check_mix(mix):
+    if any(share < 0 for share in mix.values()):
+        raise ValueError("Class shares cannot be negative")
+    if not sum(mix.values()) > 0:
+        raise ValueError("At least one class share must be positive")
+
+
+def parse_mix(value):
+    # "High=0.2,Normal=0.6,Low=0.2"
+    mix = {}
+    for part in value.split(","):
+        severity, share = part.split("=")
+        if severity not in TEMPLATES:
+            raise argparse.ArgumentTypeError(f"Unknown severity: {severity}")
+        mix[severity] = float(share)
+    try:
+        check_mix(mix)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return mix
+
+
 if __name__ == "__main__":
-    generate_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Without --rows, regenerates RawData/ModernBugs.csv (1,500 rows) as before."
+    )
+    parser.add_argument("--rows", type=int, help="Stream this many rows instead (e.g. 1000000)")
+    parser.add_argument("--out", default="RawData/SyntheticBugs.csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", type=parse_mix, help="Class shares, e.g. High=0.2,Normal=0.6,Low=0.2")
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--extra-sentences-mean", type=float, default=0.0,
+                        help="Mean follow-up sentences per report (Poisson)")
+    parser.add_argument("--max-extra-sentences", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.rows is None:
+        generate_data()
+    else:
+        generate_stream(
+            args.out, args.rows, seed=args.seed, mix=args.mix, chunk_rows=args.chunk_rows,
+            workers=args.workers, extra_mean=args.extra_sentences_mean, max_extra=args.max_extra_sentences,
+        )
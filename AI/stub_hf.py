@@ -0,0 +1,66 @@
+"""
+Local stand-in for the Hugging Face zero-shot router, for load tests and
+for exercising TRIAGE_ENGINE=remote without a token or network:
+
+    STUB_LATENCY_MS=300 uvicorn stub_hf:app --port 9000
+
+STUB_TRICKLE_MS sends the response body one byte at a time with that delay
+between bytes, like a router that is slow to stream rather than slow to start.
+    HF_API_URL=http://127.0.0.1:9000/ TRIAGE_ENGINE=remote uvicorn app.main:app --port 8000
+"""
+import asyncio
+import hashlib
+import json
+import os
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "200"))
+TRICKLE_MS = float(os.getenv("STUB_TRICKLE_MS", "0"))
+LABELS = ["High", "Normal", "Low"]
+
+app = FastAPI()
+stats = {"calls": 0, "inputs": 0}
+
+
+def fake_scores(text, labels):
+    # Deterministic per text, so repeated runs compare like with like.
+    winner = hashlib.md5(text.encode("utf-8")).digest()[0] % len(labels)
+    ordered = [labels[winner]] + [label for label in labels if label != labels[winner]]
+    return ordered, [0.7, 0.2, 0.1][:len(ordered)]
+
+
+@app.post("/")
+async def classify(request: Request):
+    body = await request.json()
+    inputs = body["inputs"]
+    labels = body.get("parameters", {}).get("candidate_labels", LABELS)
+    stats["calls"] += 1
+    stats["inputs"] += len(inputs) if isinstance(inputs, list) else 1
+
+    await asyncio.sleep(LATENCY_MS / 1000)
+
+    # Same shapes the real router returns for one input vs. a list of inputs.
+    if isinstance(inputs, list):
+        results = []
+        for text in inputs:
+            ordered, scores = fake_scores(text, labels)
+            results.append({"sequence": text, "labels": ordered, "scores": scores})
+    else:
+        ordered, scores = fake_scores(inputs, labels)
+        results = [{"label": label, "score": score} for label, score in zip(ordered, scores)]
+
+    if TRICKLE_MS > 0:
+        return StreamingResponse(trickle(json.dumps(results).encode("utf-8")), media_type="application/json")
+    return results
+
+
+async def trickle(body):
+    for i in range(len(body)):
+        await asyncio.sleep(TRICKLE_MS / 1000)
+        yield body[i:i + 1]
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
@@ -0,0 +1,33 @@
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+import stub_hf
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """AI/stub_hf.py on a free local port, for the whole session."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(stub_hf.app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/"
+    server.should_exit = True
+    thread.join(5)
+
+
+@pytest.fixture
+def stub(stub_server, monkeypatch):
+    """The stub's URL, with its call counters reset and a short default latency."""
+    monkeypatch.setattr(stub_hf, "LATENCY_MS", 50)
+    monkeypatch.setattr(stub_hf, "TRICKLE_MS", 0)
+    stub_hf.stats.update(calls=0, inputs=0)
+    return stub_server
@@ -0,0 +1,85 @@
+import asyncio
+
+import stub_hf
+from app.batching import MicroBatcher
+from app.engines import EngineError, LABELS
+from app.upstream import UpstreamClient
+
+
+async def run_batcher(predict, body, **kwargs):
+    batcher = MicroBatcher(predict, **kwargs)
+    await batcher.start()
+    try:
+        return await body(batcher)
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_calls_share_a_batch_and_get_their_own_results():
+    batches = []
+
+    def predict(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def body(batcher):
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    results = asyncio.run(run_batcher(predict, body, max_batch_size=4, max_wait_ms=20))
+
+    assert results == [i * 10 for i in range(10)]
+    assert [len(b) for b in batches] == [4, 4, 2]
+
+
+def test_failed_batch_fails_every_waiting_caller():
+    async def predict(items):
+        raise EngineError(503, "model down")
+
+    async def body(batcher):
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)), return_exceptions=True)
+
+    results = asyncio.run(run_batcher(predict, body, max_batch_size=8, max_wait_ms=20))
+
+    assert len(results) == 5
+    assert all(isinstance(r, EngineError) and r.detail == "model down" for r in results)
+
+
+def test_failure_stays_in_its_batch():
+    async def predict(items):
+        if "bad" in items:
+            raise EngineError(500, "bad batch")
+        return items
+
+    async def body(batcher):
+        first = await asyncio.gather(*(batcher.submit(x) for x in ["bad", "x"]), return_exceptions=True)
+        second = await batcher.submit("ok")
+        return first, second
+
+    first, second = asyncio.run(run_batcher(predict, body, max_batch_size=2, max_wait_ms=20))
+
+    assert all(isinstance(r, EngineError) for r in first)
+    assert second == "ok"
+
+
+def test_batches_reach_the_stub_as_one_call(stub):
+    texts = [f"bug {i}" for i in range(8)]
+
+    async def main():
+        client = UpstreamClient(stub, "test-token")
+        await client.start()
+        try:
+            return await run_batcher(
+                client.classify_many,
+                lambda batcher: batcher.submit_many(texts),
+                max_batch_size=8,
+                max_wait_ms=50,
+                max_concurrency=4,
+            )
+        finally:
+            await client.close()
+
+    results = asyncio.run(main())
+
+    assert results == [stub_hf.fake_scores(t, LABELS)[0][0] for t in texts]
+    assert stub_hf.stats == {"calls": 1, "inputs": 8}
+
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from app.cache import ResultCache
+from app.engines import EngineError, FallbackEngine, run_answer
+
+
+def test_get_many_reads_through_both_tiers(tmp_path):
+    db_path = str(tmp_path / "results.sqlite3")
+    cache = ResultCache("v1", db_path=db_path)
+    cache.put_many([("a", "High"), ("b", "Low")])
+    cache.close()
+
+    cache = ResultCache("v1", db_path=db_path)
+    assert cache.get_many(["a", "missing", "b", "a"]) == ["High", None, "Low", "High"]
+    assert cache.get_many(["a"]) == ["High"]
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (3, 1, 1)
+    cache.close()
+
+
+def test_prune_applies_disk_ttl_and_size(tmp_path):
+    cache = ResultCache("v1", db_path=str(tmp_path / "results.sqlite3"), disk_ttl=60, disk_max_entries=2)
+    cache.db.executemany(
+        "INSERT INTO results (key, severity, created) VALUES (?, ?, ?)",
+        [("old", "High", time.time() - 120)] + [(k, "Low", time.time() + i) for i, k in enumerate("abc")],
+    )
+    cache.db.commit()
+
+    assert cache.prune() == 2
+    assert sorted(k for k, in cache.db.execute("SELECT key FROM results")) == ["b", "c"]
+    cache.close()
+
+
+class Engine:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.version = f"{name}-v1"
+        self.max_concurrency = 1
+        self.fail = fail
+
+    async def predict(self, bugs):
+        if self.fail:
+            raise EngineError(500, "broken")
+        return [self.name for _ in bugs]
+
+
+def test_fallback_answers_report_the_fallback_engine():
+    local, remote = Engine("local"), Engine("remote")
+    healthy = FallbackEngine(local, remote)
+    broken = FallbackEngine(Engine("local", fail=True), remote)
+
+    assert asyncio.run(run_answer(healthy, [("t", "d")])) == (["local"], local)
+    assert asyncio.run(run_answer(broken, [("t", "d")])) == (["remote"], remote)
+    assert asyncio.run(run_answer(remote, [("t", "d")])) == (["remote"], remote)
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from app import corpus
+
+HEADER = '"bugID";"sd";"dt";"bsr";"re"\n'
+
+
+def write_export(path, rows):
+    with open(path, "w") as f:
+        f.write(HEADER)
+        for i, (summary, severity) in enumerate(rows):
+            f.write(f'"{i}";"{summary}";"2019-11-28";"{severity}";"dev"\n')
+
+
+@pytest.fixture
+def sources(tmp_path):
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    write_export(first, [("Crash on start", "critical"), ("Typo", "trivial"), ("Odd", "unknown")])
+    write_export(second, [("Slow save", "normal"), ("Data loss", "S1")])
+    return [str(first), str(second)]
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Counts how often the CSVs are actually streamed."""
+    calls = []
+    stream = corpus.iter_bug_reports
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return stream(*args, **kwargs)
+
+    monkeypatch.setattr(corpus, "iter_bug_reports", counting)
+    return calls
+
+
+def load(sources, tmp_path):
+    return corpus.load_bug_reports(sources, chunksize=2, snapshot_dir=str(tmp_path / "snapshots"))
+
+
+def test_cold_build_then_warm_reuse(sources, tmp_path, builds):
+    cold = load(sources, tmp_path)
+    assert list(cold["sd"]) == ["Crash on start", "Typo", "Slow save", "Data loss"]
+    assert list(cold["bsr"]) == ["High", "Low", "Normal", "High"]
+    assert cold["bsr"].dtype == corpus.SEVERITY_DTYPE
+    assert len(list((tmp_path / "snapshots").glob("*.parquet"))) == 1
+
+    warm = load(sources, tmp_path)
+    assert len(builds) == 1
+    pd.testing.assert_frame_equal(warm, cold)
+
+
+def test_touching_a_source_rebuilds(sources, tmp_path, builds):
+    load(sources, tmp_path)
+    write_export(sources[1], [("Slow save", "normal")])
+    stat = os.stat(sources[1])
+    os.utime(sources[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    rebuilt = load(sources, tmp_path)
+    assert len(builds) == 2
+    assert list(rebuilt["sd"]) == ["Crash on start", "Typo", "Slow save"]
+
+
+def test_a_different_severity_map_is_a_different_snapshot(sources, tmp_path, builds):
+    load(sources, tmp_path)
+    only_high = corpus.load_bug_reports(
+        sources, {"critical": "High", "s1": "High"}, snapshot_dir=str(tmp_path / "snapshots")
+    )
+    assert len(builds) == 2
+    assert list(only_high["sd"]) == ["Crash on start", "Data loss"]
+
+
+def test_without_pyarrow_loads_the_same_rows(sources, tmp_path, monkeypatch):
+    with_snapshot = load(sources, tmp_path)
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    without = corpus.load_bug_reports(sources, chunksize=2, snapshot_dir=str(tmp_path / "none"))
+
+    assert not (tmp_path / "none").exists()
+    pd.testing.assert_frame_equal(without.astype({"sd": object, "dt": object}),
+                                  with_snapshot.astype({"sd": object, "dt": object}))
+
+
+def test_unknown_target_labels_are_rejected(sources, tmp_path):
+    with pytest.raises(ValueError, match="Urgent"):
+        corpus.load_bug_reports(sources, {"critical": "Urgent"}, snapshot_dir=str(tmp_path / "snapshots"))
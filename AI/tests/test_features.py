@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.features import EmbeddingStore
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.seen = []
+
+    def encode(self, texts, batch_size=64, show_progress_bar=False):
+        self.seen.extend(texts)
+        return [[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts]
+
+
+def expected(texts):
+    return np.array(FakeEmbedder().encode(texts), dtype=np.float32)
+
+
+def never_loaded():
+    raise AssertionError("embedder loaded on a warm store")
+
+
+def test_second_instance_reuses_the_cache(tmp_path):
+    texts = ["crash on save", "typo in footer", "login fails"]
+    EmbeddingStore(tmp_path, "fake/model").encode(texts, FakeEmbedder)
+
+    store = EmbeddingStore(tmp_path, "fake/model")
+    assert len(store) == 3
+    np.testing.assert_array_equal(store.encode(texts[::-1], never_loaded), expected(texts[::-1]))
+
+
+def test_only_new_texts_are_encoded(tmp_path):
+    embedder = FakeEmbedder()
+    store = EmbeddingStore(tmp_path, "fake")
+    store.encode(["a", "b"], lambda: embedder)
+    vectors = store.encode(["b", "c", "c", "a", "d"], lambda: embedder)
+
+    assert embedder.seen == ["a", "b", "c", "d"]
+    np.testing.assert_array_equal(vectors, expected(["b", "c", "c", "a", "d"]))
+
+
+def test_empty_input(tmp_path):
+    assert EmbeddingStore(tmp_path, "fake").encode([], never_loaded).shape == (0, 0)
+
+
+def test_contiguous_rows_are_a_view_of_the_map(tmp_path):
+    texts = ["a", "b", "c", "d"]
+    EmbeddingStore(tmp_path, "fake").encode(texts, FakeEmbedder)
+    store = EmbeddingStore(tmp_path, "fake")
+
+    view = store.encode(texts[1:3], never_loaded)
+    assert isinstance(view, np.memmap)
+    assert not view.flags.writeable
+    np.testing.assert_array_equal(view, expected(texts[1:3]))
+    assert not isinstance(store.encode(["d", "a"], never_loaded), np.memmap)
+
+
+def test_shards_are_merged_past_the_limit(tmp_path):
+    store = EmbeddingStore(tmp_path, "fake", max_shards=3)
+    for text in "abcd":
+        store.encode([text], FakeEmbedder)
+
+    assert len(store.shards) == 1
+    assert len(list((tmp_path / "fake").glob("*.keys.npy"))) == 1
+    reopened = EmbeddingStore(tmp_path, "fake")
+    np.testing.assert_array_equal(reopened.encode(list("dcba"), never_loaded), expected(list("dcba")))
+    assert isinstance(reopened.encode(list("abcd"), never_loaded), np.memmap)
+
+
+@pytest.mark.parametrize("max_shards", [1, 8])
+def test_compact_keeps_every_vector(tmp_path, max_shards):
+    store = EmbeddingStore(tmp_path, "fake", max_shards=max_shards)
+    store.encode(["a", "b"], FakeEmbedder)
+    store.encode(["b", "c"], FakeEmbedder)
+    store.compact()
+
+    assert len(store) == 3
+    np.testing.assert_array_equal(store.encode(["c", "b", "a"], never_loaded), expected(["c", "b", "a"]))
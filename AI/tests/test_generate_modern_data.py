@@ -0,0 +1,36 @@
+import argparse
+
+import pytest
+
+import generate_modern_data as gen
+
+
+def generate(tmp_path, workers, **kwargs):
+    out = tmp_path / f"bugs-{workers}.csv"
+    gen.generate_stream(str(out), 2500, seed=7, chunk_rows=300, workers=workers,
+                        extra_mean=1.5, max_extra=3, **kwargs)
+    return out.read_bytes()
+
+
+def test_output_is_identical_across_worker_counts(tmp_path):
+    single = generate(tmp_path, 1)
+    assert single.count(b"\n") == 2501
+    assert generate(tmp_path, 2) == single
+    assert generate(tmp_path, 3) == single
+
+
+def test_mix_shares_are_respected(tmp_path):
+    data = generate(tmp_path, 1, mix={"High": 0, "Normal": 1, "Low": 1})
+    labels = [line.rsplit(b",", 1)[1] for line in data.splitlines()[1:]]
+    assert b"High" not in labels
+    assert set(labels) == {b"Normal", b"Low"}
+
+
+@pytest.mark.parametrize("value", ["High=0", "High=0,Normal=0,Low=0", "High=-1,Normal=2", "Urgent=1"])
+def test_parse_mix_rejects_bad_shares(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        gen.parse_mix(value)
+
+
+def test_parse_mix():
+    assert gen.parse_mix("High=0.2,Normal=0.6,Low=0.2") == {"High": 0.2, "Normal": 0.6, "Low": 0.2}
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import stub_hf
+from app import main
+from app.engines import RemoteEngine
+from app.jobs import JobQueue, QueueFull
+
+
+async def never(item):
+    await asyncio.Event().wait()
+
+
+def test_low_priority_is_refused_at_80_percent_depth():
+    async def body():
+        jobs = JobQueue(never, max_depth=10, workers=1)
+        await jobs.start()
+        try:
+            for _ in range(8):
+                jobs.submit("edit", "low")
+            with pytest.raises(QueueFull) as refused:
+                jobs.submit("edit", "low")
+            jobs.submit("new", "normal")
+            jobs.submit("new", "normal")
+            with pytest.raises(QueueFull):
+                jobs.submit("new", "normal")
+            return refused.value
+        finally:
+            await jobs.stop()
+
+    refused = asyncio.run(body())
+    assert refused.retry_after >= 1
+
+
+def test_normal_jobs_run_before_low_ones():
+    order = []
+
+    async def record(item):
+        order.append(item)
+        return item
+
+    async def body():
+        jobs = JobQueue(record, workers=1)
+        await jobs.start()
+        try:
+            ids = [jobs.submit("edit", "low")["id"], jobs.submit("new", "normal")["id"]]
+            while any(jobs.get(i)["status"] != "done" for i in ids):
+                await asyncio.sleep(0.01)
+        finally:
+            await jobs.stop()
+
+    asyncio.run(body())
+    assert order == ["new", "edit"]
+
+
+def test_failed_job_keeps_its_status_code():
+    async def fail(item):
+        raise main.EngineError(503, "model down")
+
+    async def body():
+        jobs = JobQueue(fail, workers=1)
+        await jobs.start()
+        try:
+            job = jobs.submit("bug")
+            while job["status"] in ("queued", "running"):
+                await asyncio.sleep(0.01)
+            return job
+        finally:
+            await jobs.stop()
+
+    job = asyncio.run(body())
+    assert job["status"] == "failed"
+    assert job["error"] == {"status": 503, "detail": "model down"}
+
+
+@pytest.fixture
+def api(stub, monkeypatch):
+    """The service on the remote engine, backed by a stub slow enough to keep jobs queued."""
+    monkeypatch.setattr(stub_hf, "LATENCY_MS", 2000)
+    monkeypatch.setattr(main, "load_engine", lambda: RemoteEngine(api_url=stub, token="test-token"))
+    monkeypatch.setattr(main, "CACHE_DB", "")
+    monkeypatch.setattr(main, "JOB_QUEUE_MAX", 10)
+    monkeypatch.setattr(main, "JOB_WORKERS", 1)
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + 10
+        while client.get("/health").status_code != 200:
+            assert time.monotonic() < deadline, "service never became healthy"
+            time.sleep(0.05)
+        yield client
+
+
+def submit(api, n, priority="normal"):
+    return api.post("/classify/jobs", json={"title": f"Bug {n}", "description": "Crashes", "priority": priority})
+
+
+def test_full_queue_answers_429_with_retry_after(api):
+    accepted = 0
+    while api.get("/classify/jobs/stats").json()["depth"] < 8:
+        response = submit(api, accepted)
+        assert response.status_code == 202
+        assert response.headers["Location"] == f"/classify/jobs/{response.json()['id']}"
+        accepted += 1
+
+    low = submit(api, "edit", "low")
+    assert low.status_code == 429
+    assert int(low.headers["Retry-After"]) >= 1
+
+    assert submit(api, accepted).status_code == 202
+    assert submit(api, accepted + 1).status_code == 202
+    full = submit(api, accepted + 2)
+    assert full.status_code == 429
+    assert int(full.headers["Retry-After"]) >= 1
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import stub_hf
+from app import main, metrics
+from app.engines import EngineError, FallbackEngine, RemoteEngine
+
+
+class LocalStandIn:
+    name = "local"
+    version = "local-v1"
+    max_concurrency = 1
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def predict(self, bugs):
+        if self.fail:
+            raise EngineError(500, "model broken")
+        return ["Normal" for _ in bugs]
+
+
+def serve(monkeypatch, load_engine):
+    monkeypatch.setattr(main, "load_engine", load_engine)
+    monkeypatch.setattr(main, "CACHE_DB", "")
+    return TestClient(main.app)
+
+
+def wait_until_loaded(client):
+    deadline = time.monotonic() + 10
+    while (response := client.get("/health")).json().get("status") == "starting":
+        assert time.monotonic() < deadline, "engine never finished loading"
+        time.sleep(0.05)
+    return response
+
+
+@pytest.mark.parametrize("fail, status", [(False, "ok"), (True, "failed")])
+def test_warm_up_never_goes_through_the_fallback(stub, monkeypatch, fail, status):
+    remote = RemoteEngine(api_url=stub, token="test-token")
+    with serve(monkeypatch, lambda: FallbackEngine(LocalStandIn(fail), remote)) as client:
+        health = wait_until_loaded(client)
+
+    assert health.json()["status"] == status
+    assert health.status_code == (200 if status == "ok" else 503)
+    assert stub_hf.stats["calls"] == 0
+
+
+def request_count(engine, endpoint, cache):
+    return metrics.REQUESTS.labels(engine, endpoint, "200", cache)._value.get()
+
+
+def test_fallback_answers_are_counted_under_the_fallback(stub, monkeypatch):
+    primary = LocalStandIn()
+    remote = RemoteEngine(api_url=stub, token="test-token")
+    before = request_count("remote", "classify", "miss")
+    with serve(monkeypatch, lambda: FallbackEngine(primary, remote)) as client:
+        wait_until_loaded(client)
+        primary.fail = True
+        response = client.post("/classify", json={"title": "Checkout", "description": "Crashes"})
+
+    assert response.status_code == 200
+    assert request_count("remote", "classify", "miss") == before + 1
+    assert stub_hf.stats["calls"] == 1
+
+
+def test_empty_batch_is_not_a_cache_miss(monkeypatch):
+    before = request_count("local", "batch", "none")
+    with serve(monkeypatch, LocalStandIn) as client:
+        wait_until_loaded(client)
+        response = client.post("/classify/batch", json={"bugs": []})
+
+    assert response.json() == {"results": []}
+    assert request_count("local", "batch", "none") == before + 1
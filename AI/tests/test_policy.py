@@ -0,0 +1,32 @@
+import numpy as np
+
+from app.policy import ThresholdPolicy, sweep_thresholds
+
+CLASSES = np.array(["High", "Low", "Normal"])
+
+
+def test_sweep_matches_the_policy_at_every_threshold():
+    rng = np.random.default_rng(0)
+    probs = rng.dirichlet(np.ones(3), size=500)
+    y_true = CLASSES[rng.integers(0, 3, size=500)]
+    thresholds = np.linspace(0, 1, 41)
+
+    sweep = sweep_thresholds(y_true, probs, CLASSES, thresholds=thresholds)
+
+    for i, threshold in enumerate(thresholds):
+        preds = ThresholdPolicy(CLASSES, threshold).predict(probs)
+        flagged = preds == "High"
+        tp = (flagged & (y_true == "High")).sum()
+        assert sweep["flagged"][i] == flagged.sum()
+        assert np.isclose(sweep["precision"][i], tp / flagged.sum() if flagged.any() else 0.0)
+        assert np.isclose(sweep["recall"][i], tp / (y_true == "High").sum())
+        assert np.isclose(sweep["accuracy"][i], (preds == y_true).mean())
+
+
+def test_policy_flags_high_above_threshold_and_falls_back_to_runner_up():
+    probs = np.array([
+        [0.31, 0.40, 0.29],
+        [0.30, 0.20, 0.50],
+        [0.10, 0.60, 0.30],
+    ])
+    assert list(ThresholdPolicy(CLASSES, 0.3).predict(probs)) == ["High", "Normal", "Low"]
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+import stub_hf
+from app.engines import EngineError, LABELS
+from app.upstream import UpstreamClient
+
+
+def expected(text):
+    return stub_hf.fake_scores(text, LABELS)[0][0]
+
+
+async def with_client(url, body, **kwargs):
+    client = UpstreamClient(url, "test-token", **kwargs)
+    await client.start()
+    try:
+        return await body(client)
+    finally:
+        await client.close()
+
+
+def test_identical_in_flight_texts_share_one_call(stub):
+    async def body(client):
+        return await asyncio.gather(*(client.classify_many(["Checkout crashes"]) for _ in range(20)))
+
+    results = asyncio.run(with_client(stub, body))
+
+    assert results == [[expected("Checkout crashes")]] * 20
+    assert stub_hf.stats["calls"] == 1
+
+
+def test_duplicates_within_one_call_are_sent_once(stub):
+    texts = ["a", "b", "a", "c", "b"]
+
+    async def body(client):
+        return await client.classify_many(texts)
+
+    assert asyncio.run(with_client(stub, body)) == [expected(t) for t in texts]
+    assert stub_hf.stats == {"calls": 1, "inputs": 3}
+
+
+def test_failed_call_fails_every_coalesced_caller(stub):
+    async def body(client):
+        return await asyncio.gather(
+            *(client.classify_many(["same text"]) for _ in range(5)), return_exceptions=True
+        )
+
+    # The stub only serves "/", so this path answers 404.
+    results = asyncio.run(with_client(stub + "missing", body))
+
+    assert len(results) == 5
+    assert all(isinstance(r, EngineError) and r.status_code == 503 for r in results)
+
+
+def test_deadline_covers_every_attempt(stub, monkeypatch):
+    monkeypatch.setattr(stub_hf, "LATENCY_MS", 1000)
+
+    async def body(client):
+        with pytest.raises(EngineError) as failure:
+            await client.classify_many(["slow"])
+        return failure.value
+
+    started = time.perf_counter()
+    error = asyncio.run(with_client(stub, body, attempt_timeout=0.2, attempts=5, deadline=0.3))
+
+    assert error.status_code == 504
+    assert time.perf_counter() - started < 0.8
+    assert stub_hf.stats["calls"] <= 2
+
+
+def test_deadline_covers_a_trickling_response(stub, monkeypatch):
+    # Each byte arrives well inside httpx's read timeout; the whole body does not.
+    monkeypatch.setattr(stub_hf, "LATENCY_MS", 0)
+    monkeypatch.setattr(stub_hf, "TRICKLE_MS", 20)
+
+    async def body(client):
+        with pytest.raises(EngineError) as failure:
+            await client.classify_many(["slow body"])
+        return failure.value
+
+    started = time.perf_counter()
+    error = asyncio.run(with_client(stub, body, attempt_timeout=5, attempts=2, deadline=0.5))
+
+    assert error.status_code == 504
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,102 @@
+import multiprocessing
+import re
+from collections import OrderedDict, namedtuple
+
+import pytest
+
+from app import utils
+
+Token = namedtuple("Token", "lemma_ is_stop")
+STOP_WORDS = {"the", "is", "on", "a", "when", "to"}
+
+
+def tokenize(text):
+    return [Token(word.rstrip("s") or word, word in STOP_WORDS) for word in text.split()]
+
+
+class FakeNlp:
+    """Stands in for spaCy: a lemma is the word without its trailing "s"."""
+
+    def __call__(self, text):
+        return tokenize(text)
+
+    def pipe(self, stream, as_tuples=False, batch_size=1000, n_process=1):
+        assert as_tuples
+        pairs = list(stream)
+        texts = [text for text, _ in pairs]
+        if n_process > 1:
+            with multiprocessing.Pool(n_process) as pool:
+                docs = list(pool.imap(tokenize, texts, chunksize=batch_size))
+        else:
+            docs = map(tokenize, texts)
+        return zip(docs, (context for _, context in pairs))
+
+
+def old_normalize_text(text, nlp):
+    # The per-row implementation normalize_texts replaced, verbatim.
+    if not isinstance(text, str): return ""
+    text = text.lower()
+    text = re.sub(r'https?://\S+|www\.\S+|\S+@\S+', ' ', text)
+    text = re.sub(r'[^a-z0-9\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    doc = nlp(text)
+    tokens = [token.lemma_ for token in doc if not token.is_stop and token.lemma_.strip()]
+    return " ".join(tokens)
+
+
+TEXTS = [
+    "The Submit button crashes when clicking!",
+    "See https://bugzilla.mozilla.org/1 or mail dev@example.com",
+    None,
+    "",
+    "The Submit button crashes when clicking!",
+    "  Login   FAILS on Safari  ",
+    "s s s",
+    "Typos: 'Recieve' -> 'Receive'",
+    "Login fails on safari",
+]
+
+
+@pytest.fixture(autouse=True)
+def fake_nlp(monkeypatch):
+    monkeypatch.setattr(utils, "_nlp", FakeNlp())
+    monkeypatch.setattr(utils, "_lemma_cache", OrderedDict())
+
+
+@pytest.mark.parametrize("n_process", [1, 2])
+def test_matches_the_per_row_normalizer_in_order(n_process):
+    expected = [old_normalize_text(text, FakeNlp()) for text in TEXTS]
+
+    cold = list(utils.normalize_texts(TEXTS, batch_size=2, n_process=n_process))
+    warm = list(utils.normalize_texts(TEXTS[::-1], batch_size=2, n_process=n_process))
+
+    assert cold == expected
+    assert warm == expected[::-1]
+
+
+def test_cache_hits_skip_the_parse_and_stay_bounded(monkeypatch):
+    monkeypatch.setattr(utils, "LEMMA_CACHE_SIZE", 3)
+    parsed = []
+    nlp = FakeNlp()
+    real_pipe = nlp.pipe
+
+    def pipe(stream, **kwargs):
+        pairs = list(stream)
+        parsed.extend(text for text, _ in pairs if text)
+        return real_pipe(iter(pairs), **kwargs)
+
+    monkeypatch.setattr(nlp, "pipe", pipe)
+    monkeypatch.setattr(utils, "_nlp", nlp)
+
+    # Duplicates inside one stream are looked up before the first is parsed.
+    list(utils.normalize_texts(["k bug", "m bug", "k bug"]))
+    assert parsed == ["k bug", "m bug", "k bug"]
+    parsed.clear()
+
+    assert list(utils.normalize_texts(["m bug", "k bug", "x bug", "y bug"])) == ["m bug", "k bug", "x bug", "y bug"]
+    assert parsed == ["x bug", "y bug"]
+    assert len(utils._lemma_cache) == 3
+
+
+def test_normalize_text_wraps_the_stream():
+    assert utils.normalize_text("The crashes ARE on https://x.io") == old_normalize_text("The crashes ARE on https://x.io", FakeNlp())
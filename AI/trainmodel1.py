@@ -1,5 +1,6 @@
 import numpy as np
-from sklearn.metrics import classification_report
+
+from app.policy import sweep_thresholds
 
 # ... after logreg.fit(X_train_resampled, y_train_resampled) ...
 
@@ -12,37 +13,28 @@ y_proba = logreg.predict_proba(X_test)
 high_index = list(logreg.classes_).index("High")
 print(f"The 'High' category is at index: {high_index}")
 
-# 3. Define a Custom Predict Function
-def custom_predict(probabilities, threshold):
-    final_preds = []
-    for probs in probabilities:
-        # If the probability of "High" is greater than our custom threshold...
-        if probs[high_index] > threshold:
-            final_preds.append("High")
-        else:
-            # Otherwise, pick the winner between Low and Normal
-            # We temporarily set "High" prob to -1 so it doesn't win
-            probs_copy = probs.copy()
-            probs_copy[high_index] = -1
-            max_index = np.argmax(probs_copy)
-            final_preds.append(logreg.classes_[max_index])
-    return final_preds
-
-# 4. Run a loop to find the best threshold
+# 3. Sweep every distinct P(High) in one sorted pass (see app/policy.py)
+# instead of re-running the rule and classification_report per threshold.
+sweep = sweep_thresholds(y_test, y_proba, logreg.classes_)
+
+# 4. Report the thresholds we used to check by hand, plus the best-recall one
+#    that still keeps High precision usable.
 thresholds = [0.5, 0.4, 0.3, 0.2]
+stats = sweep_thresholds(y_test, y_proba, logreg.classes_, thresholds=thresholds)
 
 print(f"\n{'='*40}")
 print("OPTIMIZING FOR RECALL (CATCHING CRITICAL BUGS)")
 print(f"{'='*40}")
 
-for t in thresholds:
+for i, t in enumerate(thresholds):
     print(f"\n--- Testing Threshold: {t} ---")
-    y_pred_custom = custom_predict(y_proba, t)
-    
-    # We only care about the 'High' row here
-    report = classification_report(y_test, y_pred_custom, output_dict=True)
-    high_stats = report['High']
-    
-    print(f"Recall (High):    {high_stats['recall']:.2f}")
-    print(f"Precision (High): {high_stats['precision']:.2f}")
-    print(f"Accuracy:         {report['accuracy']:.2f}")
\ No newline at end of file
+    print(f"Recall (High):    {stats['recall'][i]:.2f}")
+    print(f"Precision (High): {stats['precision'][i]:.2f}")
+    print(f"Accuracy:         {stats['accuracy'][i]:.2f}")
+
+usable = sweep['precision'] >= 0.5
+if usable.any():
+    best = np.flatnonzero(usable)[np.argmax(sweep['recall'][usable])]
+    print(f"\nBest of {len(sweep['threshold'])} thresholds with High precision >= 0.50: "
+          f"{sweep['threshold'][best]:.3f} (recall {sweep['recall'][best]:.2f}, "
+          f"accuracy {sweep['accuracy'][best]:.2f})")
@@ -1,7 +1,3 @@
-import pandas as pd
-import numpy as np
-import re
-import spacy
 import joblib
 import os
 
@@ -11,57 +7,40 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 from imblearn.over_sampling import SMOTE
 
+from app.corpus import SEVERITY_MAP, SOURCES, load_bug_reports
+from app.policy import ThresholdPolicy
+from app.utils import default_n_process, normalize_texts
+
 # --- 1. CONFIGURATION ---
 THRESHOLD = 0.3  # The "Magic Number" we found
-print("Initializing NLP engine...")
-nlp = spacy.load("en_core_web_sm", disable=["parser", "ner"])
+NLP_PROCESSES = int(os.getenv("NLP_PROCESSES", default_n_process()))
 
 if not os.path.exists('app'):
     os.makedirs('app')
 
 # --- 2. TEXT CLEANING ---
-def normalize_text(text):
-    if not isinstance(text, str): return ""
-    text = text.lower()
-    text = re.sub(r'https?://\S+|www\.\S+|\S+@\S+', ' ', text)
-    text = re.sub(r'[^a-z0-9\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    doc = nlp(text)
-    tokens = [token.lemma_ for token in doc if not token.is_stop and token.lemma_.strip()]
-    return " ".join(tokens)
+# Shared with the API: see app/utils.normalize_texts.
 
-# --- 3. DATA LOADING ---
+# --- 3. DATA LOADING + 4. MAPPING (3-Class System) ---
+# Streams only sd/dt/bsr in chunks and maps severities per chunk; reruns read
+# the cached snapshot in cache/corpus instead (see app/corpus.py).
 print("Loading datasets...")
 try:
-    mozilla = pd.read_csv("RawData/Mozilla.csv", delimiter=';')
-    netbeans = pd.read_csv("RawData/Netbeans.csv", delimiter=';')
-    openoffice = pd.read_csv("RawData/Openoffice.csv", delimiter=';')
-    df = pd.concat([mozilla, netbeans, openoffice], ignore_index=True)
+    df = load_bug_reports(SOURCES, SEVERITY_MAP)
 except FileNotFoundError:
     print("Error: CSV files not found in RawData folder.")
     exit()
 
-# --- 4. MAPPING (3-Class System) ---
-print("Mapping labels...")
-df['bsr'] = df['bsr'].str.lower()
-severity_map = {
-    'blocker': 'High', 'critical': 'High', 's1': 'High', 'major': 'High', 's2': 'High',
-    'normal': 'Normal', 's3': 'Normal',
-    'minor': 'Low', 's4': 'Low', 'trivial': 'Low', 'enhancement': 'Low'
-}
-df['bsr'] = df['bsr'].map(severity_map)
-df = df.dropna(subset=['bsr'])
-
 # --- 5. PREPROCESSING ---
-print("Normalizing text...")
+print(f"Normalizing text ({NLP_PROCESSES} processes)...")
 df['text'] = df['sd'] + " " + df['dt']
-df['text'] = df['text'].apply(normalize_text)
+df['text'] = list(normalize_texts(df['text'], batch_size=1000, n_process=NLP_PROCESSES))
 
 # --- 6. VECTORIZATION ---
 print("Vectorizing...")
 tfidf = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
 X = tfidf.fit_transform(df["text"])
-y = df['bsr']
+y = df['bsr'].astype(str)
 
 # --- 7. SPLIT & SMOTE ---
 X_train, X_test, y_train, y_test = train_test_split(
@@ -82,19 +61,7 @@ print(f"Evaluating with Custom Threshold: {THRESHOLD}...")
 
 # Get raw probabilities (e.g., [0.1, 0.6, 0.3])
 probs = logreg.predict_proba(X_test)
-high_index = list(logreg.classes_).index("High")
-
-final_preds = []
-for p in probs:
-    # If "High" probability > 0.3, force it to be High
-    if p[high_index] > THRESHOLD:
-        final_preds.append("High")
-    else:
-        # Otherwise, pick the winner of the remaining classes
-        p_copy = p.copy()
-        p_copy[high_index] = -1 # Remove High from contention
-        best_idx = np.argmax(p_copy)
-        final_preds.append(logreg.classes_[best_idx])
+final_preds = ThresholdPolicy(logreg.classes_, THRESHOLD).predict(probs)
 
 # Print the final report
 print("\n" + "="*50)
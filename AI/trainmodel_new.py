@@ -1,5 +1,4 @@
 import pandas as pd
-import numpy as np
 import joblib
 from sentence_transformers import SentenceTransformer
 from sklearn.linear_model import LogisticRegression
@@ -7,15 +6,17 @@ from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
 from sklearn.utils import resample
 
+from app.corpus import load_bug_reports
+from app.features import EmbeddingStore
+
+EMBEDDER = 'all-MiniLM-L6-v2'
+
 # 1. LOAD OLD DATA
 print("Loading and balancing original data...")
-mozilla = pd.read_csv("RawData/Mozilla.csv", delimiter=';')
-df_old = mozilla.copy()
-
-# Map and clean
+# Map and clean (chunked, cached in cache/corpus; see app/corpus.py)
 severity_map = {'blocker': 'High', 'critical': 'High', 'major': 'High', 'normal': 'Normal', 'minor': 'Low', 'trivial': 'Low'}
-df_old['bsr'] = df_old['bsr'].str.lower().map(severity_map)
-df_old = df_old.dropna(subset=['bsr'])
+df_old = load_bug_reports(["RawData/Mozilla.csv"], severity_map)
+df_old['bsr'] = df_old['bsr'].astype(str)
 df_old['text'] = df_old['sd'].fillna('') + " " + df_old['dt'].fillna('')
 
 # Downsample 'Normal' to match 'High' count
@@ -30,16 +31,17 @@ df_modern = pd.read_csv("RawData/ModernBugs.csv")
 df_modern.columns = ['text', 'bsr']
 df_final = pd.concat([df_old_bal, df_modern], ignore_index=True)
 
-# 3. SPLIT (Crucial to detect overfitting)
-X_train_text, X_test_text, y_train, y_test = train_test_split(
-    df_final['text'], df_final['bsr'], test_size=0.2, stratify=df_final['bsr'], random_state=42
-)
-
-# 4. ENCODE
+# 3. ENCODE
+# Vectors are cached in features/ by text hash, so reruns only encode new rows.
+# One call for the whole corpus: a run adds at most one shard to the store.
 print("Encoding Semantic Vectors (this is the smart part)...")
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
-X_train = embedder.encode(X_train_text.tolist(), show_progress_bar=True)
-X_test = embedder.encode(X_test_text.tolist(), show_progress_bar=True)
+store = EmbeddingStore("features", EMBEDDER)
+X = store.encode(df_final['text'].tolist(), lambda: SentenceTransformer(EMBEDDER))
+
+# 4. SPLIT (Crucial to detect overfitting)
+X_train, X_test, y_train, y_test = train_test_split(
+    X, df_final['bsr'], test_size=0.2, stratify=df_final['bsr'], random_state=42
+)
 
 # 5. TRAIN
 print("Training Semantic Classifier...")